@@ -1,16 +1,51 @@
-from flask import Flask
-from config import Config
+import click
+from flask import Flask, jsonify
+from sqlalchemy.orm import configure_mappers
+from config import get_config
 from extensions import db, jwt
 import models
 from routes import auth_bp, vegetable_bp, transaction_bp, finance_bp
 from flask_cors import CORS
+from pagination import InvalidCursor
+from category_predictor import predictor
+from catalog_cache import catalog_cache
+from timeseries import timeseries_cache
+from database import REPORTING_BIND, apply_sqlite_pragmas
+from reporting import reporting
+from user_cache import user_cache
+from password_hasher import password_hasher, HasherBusy
+from json_provider import FastJSONProvider
+from compression import compression
+from metrics import metrics
+from query_guard import query_guard
 
-def create_app():
+def create_app(config_name=None):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(get_config(config_name))
 
     db.init_app(app)
+    with app.app_context():
+        for key, engine in db.engines.items():
+            apply_sqlite_pragmas(app, engine, read_only=key == REPORTING_BIND)
+    # Only the `flask db` commands read app.extensions["migrate"], and they
+    # always run inside a click context. Gunicorn and the benchmarks have
+    # none, so they skip importing flask_migrate/alembic (~180 ms of every
+    # cold start, see benchmarks/cold_start.py). Code that calls
+    # flask_migrate outside the CLI must register Migrate itself.
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db, render_as_batch=True)
     jwt.init_app(app)
+    predictor.init_app(app)
+    catalog_cache.init_app(app)
+    timeseries_cache.init_app(app)
+    user_cache.init_app(app)
+    password_hasher.init_app(app)
+    metrics.init_app(app)
+    reporting.init_app(app)
+    query_guard.init_app(app)
+    compression.init_app(app)
 
     CORS(app, resources={
         r"/api/*": {
@@ -25,8 +60,23 @@ def create_app():
     app.register_blueprint(transaction_bp, url_prefix="/transaction")
     app.register_blueprint(finance_bp, url_prefix="/finance")
 
-    with app.app_context():
+    @app.errorhandler(InvalidCursor)
+    def invalid_cursor(e):
+        return jsonify({"message": "Cursor tidak valid"}), 400
+
+    @app.errorhandler(HasherBusy)
+    def hasher_busy(e):
+        return jsonify({"message": "Server sedang sibuk, coba lagi"}), 503, {"Retry-After": "1"}
+
+    # Resolve relationships now rather than on the first query, so preloaded
+    # workers inherit configured mappers from the master
+    configure_mappers()
+
+    @app.cli.command("init-db")
+    def init_db():
+        """Create missing tables (dev/tests; deployments run `flask db upgrade`)"""
         db.create_all()
+        click.echo("✓ Skema database siap")
 
     return app
 
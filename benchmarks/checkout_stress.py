@@ -0,0 +1,110 @@
+"""Concurrent checkout stress test for /transaction/create.
+
+    python benchmarks/checkout_stress.py [--threads 8] [--stock 300] [--seconds 30]
+
+Many threads check out the same few vegetables through the Flask test
+client against a throwaway SQLite file (prod profile) until every one is
+sold out (or ``--seconds`` runs out). Afterwards it checks that checkouts
+were refused with 409 once stock ran short, that every vegetable ended at
+exactly zero and that sold quantity equals the starting stock, and prints
+checkouts/s per second of the run.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=30, help="give up if stock is not sold out by then")
+    parser.add_argument("--stock", type=int, default=300)
+    parser.add_argument("--vegetables", type=int, default=3)
+    args = parser.parse_args()
+
+    config = get_config("prod")
+    config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "checkout.db")
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from extensions import db
+    from models import DetailTransactions, Users, Vegetables
+
+    app = create_app("prod")
+    with app.app_context():
+        db.create_all()
+        user = Users(name="Bench", email="bench@parisy.com", password="-", role="user", sub_role="warga")
+        db.session.add(user)
+        db.session.commit()
+        vegetable_ids = []
+        for i in range(args.vegetables):
+            veg = Vegetables(name=f"Stress {i}", price=1000, stock=args.stock, category="daun", created_by=user.id)
+            db.session.add(veg)
+            db.session.commit()
+            vegetable_ids.append(veg.id)
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    statuses = Counter()
+    per_second = Counter()
+    started = time.monotonic()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        while not stop.is_set():
+            items = [
+                {"vegetable_id": vegetable_id, "quantity": rng.randint(1, 3)}
+                for vegetable_id in rng.sample(vegetable_ids, rng.randint(1, len(vegetable_ids)))
+            ]
+            response = client.post("/transaction/create", json={"items": items}, headers=headers)
+            with lock:
+                statuses[response.status_code] += 1
+                if response.status_code == 201:
+                    per_second[int(time.monotonic() - started)] += 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    deadline = started + args.seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        with app.app_context():
+            remaining = db.session.query(db.func.sum(Vegetables.stock)).filter(Vegetables.id.in_(vegetable_ids)).scalar()
+            db.session.remove()
+        if remaining == 0:
+            break
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    with app.app_context():
+        ok = statuses[409] > 0 and set(statuses) <= {201, 409}
+        for vegetable_id in vegetable_ids:
+            stock = db.session.get(Vegetables, vegetable_id).stock
+            sold = db.session.query(db.func.coalesce(db.func.sum(DetailTransactions.quantity), 0)).filter_by(
+                vegetable_id=vegetable_id
+            ).scalar()
+            consistent = stock == 0 and sold == args.stock
+            ok = ok and consistent
+            print(f"sayuran {vegetable_id}: stok={stock} terjual={sold} {'✓' if consistent else '✗'}")
+
+    print("status:", dict(statuses), "✓" if statuses[409] > 0 and set(statuses) <= {201, 409} else "✗")
+    print("checkout/s per detik:", [per_second[s] for s in range(int(elapsed) + 1)])
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Cold-start time of one worker, with and without app preloading.
+
+    python benchmarks/cold_start.py [--runs 7] [--root /path/to/checkout]
+
+"fresh" starts a new interpreter per run, like a worker of a server that
+does not preload: import, create_app("prod") and the first /vegetable/list
+request are timed separately. "preload" builds the app once and forks per
+run, like gunicorn with preload_app: only fork-to-first-response is left.
+Pass --root to time another checkout (e.g. a worktree of an older commit)
+against the same database.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter; argv: root, database path
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from config import get_config
+get_config("prod").SQLALCHEMY_DATABASE_URI = "sqlite:///" + sys.argv[2]
+from app import create_app
+imported = time.perf_counter()
+app = create_app("prod")
+created = time.perf_counter()
+response = app.test_client().get("/vegetable/list")
+assert response.status_code == 200, response.status_code
+served = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": created - imported, "first_request": served - created}))
+"""
+
+
+def prepare(root, path):
+    """Create the schema and one vegetable, whichever version ``root`` is"""
+    subprocess.run([sys.executable, "-c", f"""
+import sys
+sys.path.insert(0, {root!r})
+from config import get_config
+get_config("prod").SQLALCHEMY_DATABASE_URI = "sqlite:///" + {path!r}
+from app import create_app
+from extensions import db
+from models import Vegetables
+app = create_app("prod")
+with app.app_context():
+    db.create_all()
+    db.session.add(Vegetables(name="Wortel", price=1000, stock=10, category="akar"))
+    db.session.commit()
+"""], check=True, cwd=root)
+
+
+def fresh(root, path, runs):
+    results = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, root, path], check=True, capture_output=True, text=True, cwd=root
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["process"] = time.perf_counter() - started
+        results.append(result)
+    return {key: statistics.median(r[key] for r in results) for key in results[0]}
+
+
+def preload(root, path, runs):
+    sys.path.insert(0, root)
+    from config import get_config
+    get_config("prod").SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+    from app import create_app
+    app = create_app("prod")
+
+    timings = []
+    for _ in range(runs):
+        read, write = os.pipe()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            status = app.test_client().get("/vegetable/list").status_code
+            os.write(write, json.dumps([status, time.perf_counter() - started]).encode())
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read) as pipe:
+            status, elapsed = json.loads(pipe.read())
+        os.waitpid(pid, 0)
+        assert status == 200, status
+        timings.append(elapsed)
+    return {"fork_to_first_response": statistics.median(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--root", default=ROOT)
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    path = os.path.join(tempfile.mkdtemp(), "cold-start.db")
+    prepare(root, path)
+
+    print(f"{root}, median dari {args.runs} kali")
+    for key, seconds in fresh(root, path, args.runs).items():
+        print(f"  fresh   {key:<24}{seconds * 1000:8.1f} ms")
+    if hasattr(os, "fork"):
+        for key, seconds in preload(root, path, args.runs).items():
+            print(f"  preload {key:<24}{seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
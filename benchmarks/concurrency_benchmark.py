@@ -0,0 +1,108 @@
+"""Read throughput while writes are in flight, per config profile.
+
+    python benchmarks/concurrency_benchmark.py [--readers 4] [--writers 2] [--seconds 5]
+
+Runs the same mixed workload against a throwaway SQLite file with the dev
+profile (rollback journal, default pragmas) and the prod profile (WAL,
+busy timeout, synchronous=NORMAL, mmap, larger cache) and reports reads/s,
+writes/s and ``database is locked`` errors.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+from config import get_config
+
+
+def run(profile, args):
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.db")
+    config = get_config(profile)
+    config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+
+    from app import create_app
+    from extensions import db
+    from models import Transactions, Users
+
+    app = create_app(profile)
+    with app.app_context():
+        db.create_all()
+        user = Users(name="Bench", email="bench@parisy.com", password="-", role="user", sub_role="warga")
+        db.session.add(user)
+        db.session.commit()
+        db.session.execute(Transactions.__table__.insert(), [
+            {"code": f"SEED{i}", "user_id": user.id, "total_price": 1000}
+            for i in range(5000)
+        ])
+        db.session.commit()
+        user_id = user.id
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def reader():
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    Transactions.query.filter_by(user_id=user_id).order_by(
+                        Transactions.created_at.desc(), Transactions.id.desc()
+                    ).limit(50).all()
+                    count("reads")
+                except OperationalError:
+                    count("locked")
+                db.session.rollback()
+
+    def writer(n):
+        i = 0
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    db.session.add(Transactions(code=f"W{n}-{i}", user_id=user_id, total_price=1000))
+                    db.session.commit()
+                    count("writes")
+                except OperationalError:
+                    db.session.rollback()
+                    count("locked")
+                i += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        db.engine.dispose()
+
+    return {key: value / args.seconds if key != "locked" else value for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8}{'reads/s':>10}{'writes/s':>10}{'locked':>8}")
+    for profile in ("dev", "prod"):
+        result = run(profile, args)
+        print(f"{profile:<8}{result['reads']:>10.0f}{result['writes']:>10.0f}{result['locked']:>8}")
+
+
+if __name__ == "__main__":
+    main()
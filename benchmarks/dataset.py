@@ -0,0 +1,87 @@
+"""Synthetic datasets for the benchmark suite.
+
+    python benchmarks/dataset.py --scale 100k [--seed 1] [--data-dir /tmp/parisy-bench]
+
+Builds (once per scale and seed) a SQLite file with ``seeder.bulk_seed``:
+users, a 200-item catalog and ``SCALES[scale]`` transactions spread over
+the last year. Every user's password is ``PASSWORD``. The finance rollup and
+product sales are rebuilt and the file is ANALYZEd, so it is ready to be
+served as is. A file missing a table of the current models is rebuilt.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seeder import BULK_PASSWORD as PASSWORD, bulk_seed
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def dataset_path(scale, seed, data_dir=None):
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), "parisy-bench")
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, f"market-{scale}-seed{seed}.db")
+
+
+def has_schema(path):
+    """Whether the file has every table of the current models (older builds lack new ones)"""
+    import models  # noqa: F401 (registers the tables)
+    from extensions import db
+    conn = sqlite3.connect(path)
+    try:
+        tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    return set(db.metadata.tables) <= tables
+
+
+def ensure(scale, seed=1, data_dir=None, rebuild=False):
+    """Path of the dataset for ``scale``, building it first if needed or out of date"""
+    path = dataset_path(scale, seed, data_dir)
+    if os.path.exists(path) and not rebuild and has_schema(path):
+        return path
+
+    from config import get_config
+    partial = path + ".partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    config = get_config("prod")
+    previous = config.SQLALCHEMY_DATABASE_URI
+    config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + partial
+
+    from app import create_app
+    from extensions import db
+    started = time.perf_counter()
+    app = create_app("prod")
+    with app.app_context():
+        db.create_all()
+        bulk_seed(SCALES[scale], seed)
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        db.engine.dispose()
+    config.SQLALCHEMY_DATABASE_URI = previous
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(partial + suffix):
+            os.remove(partial + suffix)
+    os.replace(partial, path)
+    print(f"✓ dataset {scale} dibangun dalam {time.perf_counter() - started:.1f} s: {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    print(ensure(args.scale, args.seed, args.data_dir, args.rebuild))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""Per-endpoint latency, throughput and query counts over a synthetic dataset.
+
+    python benchmarks/load_test.py --scale 100k [--mode client|http|both] [--requests 100]
+        [--threads 8] [--baseline benchmarks/baseline-100k.json] [--save] [--tolerance 0.25]
+
+Builds or reuses the ``dataset.py`` dataset for ``--scale``, then runs one
+scenario per blueprint route: reads first, then writes. ``client`` mode
+times sequential requests through the Flask test client. ``http`` mode
+serves the app on a local threaded server and drives it from ``--threads``
+concurrent HTTP clients. Each endpoint reports p50/p95/p99 latency,
+requests/s, SQL queries per request and errors.
+
+``--save`` writes the results as a JSON baseline. Without it, results are
+compared against an existing baseline: a p95 more than ``--tolerance``
+slower (and at least ``--min-delta`` ms), more queries per request or new errors are
+flagged and the script exits with status 1.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataset
+
+
+class Endpoint:
+    """One benchmark scenario: how to build a request and what to remember from its response"""
+
+    def __init__(self, name, method, path, body=None, user="admin", weight=1.0, setup=None, record=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.user = user
+        self.weight = weight
+        self.setup = setup
+        self.record = record
+
+
+class Context:
+    """Ids from the dataset plus rows created by earlier write scenarios"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.created = {"vegetables": [], "transactions": [], "emails": [], "users": []}
+
+    def next(self):
+        with self.lock:
+            self.sequence += 1
+            return self.sequence
+
+    def pick(self, items):
+        with self.lock:
+            return self.rng.choice(items)
+
+    def pop(self, kind):
+        with self.lock:
+            return self.created[kind].pop()
+
+
+def load_context(ctx, app):
+    from flask_jwt_extended import create_access_token
+    from extensions import db
+    from models import Transactions, Users, Vegetables
+    from user_cache import role_claims
+
+    with app.app_context():
+        admin = Users.query.filter_by(sub_role="admin").first()
+        buyer_id = db.session.query(Transactions.user_id).group_by(Transactions.user_id).order_by(
+            db.func.count().desc()
+        ).limit(1).scalar()
+        buyer = db.session.get(Users, buyer_id)
+        ctx.tokens = {
+            name: create_access_token(identity=str(user.id), additional_claims=role_claims(user))
+            for name, user in (("admin", admin), ("warga", buyer))
+        }
+        ctx.buyer_email = buyer.email
+        vegetables = Vegetables.query.filter_by(status="available").all()
+        ctx.vegetable_ids = [veg.id for veg in vegetables]
+        ctx.vegetable_terms = sorted({word[:4].lower() for veg in vegetables for word in veg.name.split()})
+        ctx.categories = sorted({veg.category for veg in vegetables})
+        ctx.max_transaction_id = db.session.query(db.func.max(Transactions.id)).scalar()
+        ctx.user_ids = [row.id for row in db.session.query(Users.id).filter_by(sub_role="warga").limit(1000)]
+        latest = db.session.query(db.func.max(Transactions.created_at)).scalar()
+        ctx.export_window = ((latest - timedelta(days=1)).strftime("%Y-%m-%d"), latest.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def checkout_items(ctx):
+    with ctx.lock:
+        picked = ctx.rng.sample(ctx.vegetable_ids, ctx.rng.randint(1, 3))
+        return [{"vegetable_id": vegetable_id, "quantity": ctx.rng.randint(1, 3)} for vegetable_id in picked]
+
+
+def register_body(ctx):
+    email = f"uji{ctx.next()}@parisy.com"
+    with ctx.lock:
+        ctx.created["emails"].append(email)
+    return {"name": "Warga Uji", "email": email, "password": dataset.PASSWORD, "role": "user", "sub_role": "warga"}
+
+
+def registered_user_ids(ctx, app):
+    from models import Users
+    with app.app_context():
+        ctx.created["users"] = [
+            user.id for user in Users.query.filter(Users.email.in_(ctx.created["emails"]))
+        ]
+
+
+def endpoints():
+    """Every blueprint route, reads before writes"""
+    def remember(kind, key):
+        def record(ctx, data):
+            with ctx.lock:
+                ctx.created[kind].append(data[key] if not isinstance(key, tuple) else data[key[0]][key[1]])
+        return record
+
+    return [
+        # vegetable
+        Endpoint("GET /vegetable/list", "GET", lambda ctx: "/vegetable/list", user=None),
+        Endpoint("GET /vegetable/get/<id>", "GET", lambda ctx: f"/vegetable/get/{ctx.pick(ctx.vegetable_ids)}", user=None),
+        Endpoint("GET /vegetable/by-category/<c>", "GET", lambda ctx: f"/vegetable/by-category/{ctx.pick(ctx.categories)}", user=None),
+        Endpoint("GET /vegetable/search", "GET", lambda ctx: f"/vegetable/search?q={ctx.pick(ctx.vegetable_terms)}", user=None),
+        Endpoint("GET /vegetable/admin/list", "GET", lambda ctx: "/vegetable/admin/list"),
+        Endpoint("GET /vegetable/admin/cache-stats", "GET", lambda ctx: "/vegetable/admin/cache-stats"),
+        Endpoint("GET /vegetable/category-status/<id>", "GET", lambda ctx: f"/vegetable/category-status/{ctx.pick(ctx.vegetable_ids)}"),
+        Endpoint("GET /vegetable/stock-history/<id>", "GET", lambda ctx: f"/vegetable/stock-history/{ctx.pick(ctx.vegetable_ids)}"),
+        # transaction
+        Endpoint("GET /transaction/history", "GET", lambda ctx: "/transaction/history", user="warga"),
+        Endpoint("GET /transaction/detail/<id>", "GET",
+                 lambda ctx: f"/transaction/detail/{ctx.pick(range(1, ctx.max_transaction_id + 1))}"),
+        Endpoint("GET /transaction/all", "GET", lambda ctx: "/transaction/all"),
+        # finance
+        Endpoint("GET /finance/summary", "GET", lambda ctx: "/finance/summary"),
+        Endpoint("GET /finance/history", "GET", lambda ctx: "/finance/history"),
+        Endpoint("GET /finance/history?status", "GET", lambda ctx: "/finance/history?status=pending"),
+        Endpoint("GET /finance/timeseries", "GET", lambda ctx: "/finance/timeseries?granularity=week"),
+        Endpoint("GET /finance/products", "GET", lambda ctx: "/finance/products"),
+        Endpoint("GET /finance/products/top", "GET", lambda ctx: "/finance/products/top?limit=3"),
+        Endpoint("GET /finance/history/export", "GET",
+                 lambda ctx: "/finance/history/export?format=ndjson&start_date={}&end_date={}".format(*ctx.export_window),
+                 weight=0.2),
+        # operations
+        Endpoint("GET /metrics", "GET", lambda ctx: "/metrics", user=None),
+        # auth
+        Endpoint("GET /auth/profile/<id>", "GET", lambda ctx: f"/auth/profile/{ctx.pick(ctx.user_ids)}"),
+        Endpoint("GET /auth/all", "GET", lambda ctx: "/auth/all"),
+        Endpoint("GET /auth/logout", "GET", lambda ctx: "/auth/logout", user="warga"),
+        Endpoint("POST /auth/login", "POST", lambda ctx: "/auth/login",
+                 body=lambda ctx: {"email": ctx.buyer_email, "password": dataset.PASSWORD}, user=None, weight=0.1),
+        # writes
+        Endpoint("POST /vegetable/add", "POST", lambda ctx: "/vegetable/add",
+                 body=lambda ctx: {"name": f"Sayur Uji {ctx.next()}", "price": 5000, "stock": 10, "category": "daun"},
+                 record=remember("vegetables", ("vegetable", "id"))),
+        Endpoint("PUT /vegetable/update/<id>", "PUT", lambda ctx: f"/vegetable/update/{ctx.pick(ctx.created['vegetables'])}",
+                 body=lambda ctx: {"description": f"Deskripsi {ctx.next()}"}),
+        Endpoint("PUT /vegetable/update-stock/<id>", "PUT", lambda ctx: f"/vegetable/update-stock/{ctx.pick(ctx.created['vegetables'])}",
+                 body=lambda ctx: {"delta": 5, "kind": "restock"}),
+        Endpoint("PUT /vegetable/update-status/<id>", "PUT", lambda ctx: f"/vegetable/update-status/{ctx.pick(ctx.created['vegetables'])}",
+                 body=lambda ctx: {"status": "available"}),
+        Endpoint("DELETE /vegetable/delete/<id>", "DELETE", lambda ctx: f"/vegetable/delete/{ctx.pop('vegetables')}"),
+        Endpoint("POST /transaction/create", "POST", lambda ctx: "/transaction/create",
+                 body=lambda ctx: {"items": checkout_items(ctx), "payment_method": "cash"}, user="warga",
+                 record=remember("transactions", "transaction_id")),
+        Endpoint("POST /transaction/update/<id>", "POST", lambda ctx: f"/transaction/update/{ctx.pick(ctx.created['transactions'])}",
+                 body=lambda ctx: {"transaction_status": ctx.pick(["pending", "completed", "cancelled"])}),
+        Endpoint("DELETE /transaction/delete/<id>", "DELETE", lambda ctx: f"/transaction/delete/{ctx.pop('transactions')}"),
+        Endpoint("POST /auth/register", "POST", lambda ctx: "/auth/register",
+                 body=register_body, user=None, weight=0.1),
+        Endpoint("PUT /auth/edit/<id>", "PUT", lambda ctx: f"/auth/edit/{ctx.pick(ctx.user_ids)}",
+                 body=lambda ctx: {"phone": f"08{ctx.next():010d}"}),
+        Endpoint("DELETE /auth/delete/<id>", "DELETE", lambda ctx: f"/auth/delete/{ctx.pop('users')}",
+                 weight=0.1, setup=registered_user_ids),
+    ]
+
+
+def uncovered_routes(app, scenarios):
+    names = {scenario.name.split("?")[0].split(" ")[1].split("/<")[0] for scenario in scenarios}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        if rule.rule.split("/<")[0] not in names:
+            missing.append(rule.rule)
+    return missing
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.lock = threading.Lock()
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self.increment)
+
+    def increment(self, *args, **kwargs):
+        with self.lock:
+            self.count += 1
+
+
+def summarize(latencies, elapsed, queries, errors):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "queries": round(queries / len(latencies), 2),
+        "errors": errors,
+    }
+
+
+def run_client(app, ctx, scenarios, requests, counter):
+    client = app.test_client()
+    results = {}
+    for scenario in scenarios:
+        if scenario.setup:
+            scenario.setup(ctx, app)
+        count = max(2, int(requests * scenario.weight))
+        headers = {"Authorization": f"Bearer {ctx.tokens[scenario.user]}"} if scenario.user else {}
+        latencies, errors, queries = [], 0, 0
+        started = time.perf_counter()
+        for _ in range(count):
+            path = scenario.path(ctx)
+            body = scenario.body(ctx) if scenario.body else None
+            before = counter.count
+            start = time.perf_counter()
+            response = client.open(path, method=scenario.method, json=body, headers=headers)
+            response.get_data()
+            latencies.append(time.perf_counter() - start)
+            queries += counter.count - before
+            if response.status_code >= 400:
+                errors += 1
+            elif scenario.record:
+                scenario.record(ctx, response.get_json())
+        results[scenario.name] = summarize(latencies, time.perf_counter() - started, queries, errors)
+        print_row(scenario.name, results[scenario.name])
+    return results
+
+
+def run_http(app, ctx, scenarios, requests, threads, counter):
+    import requests as http
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = http.Session()
+        return local.session
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for scenario in scenarios:
+                if scenario.setup:
+                    scenario.setup(ctx, app)
+                count = max(2, int(requests * scenario.weight))
+                headers = {"Authorization": f"Bearer {ctx.tokens[scenario.user]}"} if scenario.user else {}
+
+                def one(_):
+                    path = scenario.path(ctx)
+                    body = scenario.body(ctx) if scenario.body else None
+                    start = time.perf_counter()
+                    response = session().request(scenario.method, base + path, json=body, headers=headers)
+                    elapsed = time.perf_counter() - start
+                    if response.status_code < 400 and scenario.record:
+                        scenario.record(ctx, response.json())
+                    return elapsed, response.status_code >= 400
+
+                before = counter.count
+                started = time.perf_counter()
+                outcomes = list(pool.map(one, range(count)))
+                elapsed = time.perf_counter() - started
+                results[scenario.name] = summarize(
+                    [latency for latency, _ in outcomes], elapsed,
+                    counter.count - before, sum(error for _, error in outcomes)
+                )
+                print_row(scenario.name, results[scenario.name])
+    finally:
+        server.shutdown()
+    return results
+
+
+def print_row(name, result):
+    print(f"  {name:<40} p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms"
+          f"  {result['rps']:8.1f} req/s  {result['queries']:5.1f} q/req  {result['errors']} error")
+
+
+def regressions(results, baseline, tolerance, min_delta):
+    flagged = []
+    for mode, endpoints_ in results.items():
+        for name, result in endpoints_.items():
+            previous = baseline.get("results", {}).get(mode, {}).get(name)
+            if previous is None:
+                continue
+            slower = result["p95_ms"] - previous["p95_ms"]
+            if slower > min_delta and result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                flagged.append(f"{mode} {name}: p95 {previous['p95_ms']} → {result['p95_ms']} ms")
+            if result["queries"] > previous["queries"] + 0.5:
+                flagged.append(f"{mode} {name}: query {previous['queries']} → {result['queries']} per request")
+            if result["errors"] > previous["errors"]:
+                flagged.append(f"{mode} {name}: error {previous['errors']} → {result['errors']}")
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=dataset.SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--mode", choices=["client", "http", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--baseline", default=None, help="default benchmarks/baseline-<scale>.json")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=2.0, help="ignore p95 changes below this many ms")
+    args = parser.parse_args()
+    baseline_path = args.baseline or os.path.join(os.path.dirname(os.path.abspath(__file__)), f"baseline-{args.scale}.json")
+
+    source = dataset.ensure(args.scale, args.seed, args.data_dir)
+    # Writes go to a scratch copy so the cached dataset stays pristine
+    scratch = source.replace(".db", ".run.db")
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+
+    from config import get_config
+    get_config("prod").SQLALCHEMY_DATABASE_URI = "sqlite:///" + scratch
+    from app import create_app
+    from extensions import db
+
+    app = create_app("prod")
+    ctx = Context(args.seed)
+    load_context(ctx, app)
+    scenarios = endpoints()
+    missing = uncovered_routes(app, scenarios)
+    if missing:
+        print("! route tanpa skenario:", ", ".join(missing))
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+
+    results = {}
+    modes = ["client", "http"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        print(f"[{mode}] skala {args.scale}, {args.requests} request per endpoint")
+        if mode == "client":
+            results[mode] = run_client(app, ctx, scenarios, args.requests, counter)
+        else:
+            results[mode] = run_http(app, ctx, scenarios, args.requests, args.threads, counter)
+
+    report = {
+        "scale": args.scale,
+        "seed": args.seed,
+        "requests": args.requests,
+        "threads": args.threads,
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+    if args.save:
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"✓ baseline disimpan: {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            flagged = regressions(results, json.load(f), args.tolerance, args.min_delta)
+        for line in flagged:
+            print(f"✗ regresi {line}")
+        if flagged:
+            raise SystemExit(1)
+        print(f"✓ tidak ada regresi dibanding {baseline_path}")
+    else:
+        print(f"baseline {baseline_path} belum ada, jalankan dengan --save")
+
+
+if __name__ == "__main__":
+    main()
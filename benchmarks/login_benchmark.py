@@ -0,0 +1,102 @@
+"""Login requests per second per core, with catalog latency alongside.
+
+    python benchmarks/login_benchmark.py [--threads 8] [--seconds 5] [--method scrypt:32768:8:1]
+
+Hammers /auth/login from several threads through the Flask test client
+while one thread keeps reading /vegetable/list, and reports logins/s,
+logins/s per core and the p95 catalog latency. Run it with different
+--workers values to see how the bounded hashing pool keeps catalog reads
+responsive during a login burst.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+
+from config import get_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--method", default=None, help="PASSWORD_HASH_METHOD")
+    args = parser.parse_args()
+
+    config = get_config("prod")
+    config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "login.db")
+    if args.workers:
+        config.PASSWORD_HASH_WORKERS = args.workers
+    if args.method:
+        config.PASSWORD_HASH_METHOD = args.method
+
+    from app import create_app
+    from extensions import db
+    from models import Users, Vegetables
+
+    app = create_app("prod")
+    method = app.config["PASSWORD_HASH_METHOD"]
+    with app.app_context():
+        db.create_all()
+        hashed = generate_password_hash("rahasia", method)
+        db.session.execute(Users.__table__.insert(), [
+            {"name": f"User {i}", "email": f"user{i}@parisy.com", "password": hashed,
+             "role": "user", "sub_role": "warga"}
+            for i in range(args.users)
+        ])
+        db.session.add(Vegetables(name="Wortel", price=1000, stock=10, category="akar"))
+        db.session.commit()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    statuses = Counter()
+    catalog = []
+
+    def login(n):
+        client = app.test_client()
+        i = n
+        while not stop.is_set():
+            response = client.post("/auth/login", json={
+                "email": f"user{i % args.users}@parisy.com", "password": "rahasia"
+            })
+            with lock:
+                statuses[response.status_code] += 1
+            i += args.threads
+
+    def browse():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get("/vegetable/list")
+            catalog.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=login, args=(n,)) for n in range(args.threads)]
+    threads.append(threading.Thread(target=browse))
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    cores = os.cpu_count() or 1
+    per_second = statuses[200] / args.seconds
+    p95 = statistics.quantiles(catalog, n=20)[-1] if len(catalog) > 1 else float("nan")
+    print(f"method={method} workers={app.config['PASSWORD_HASH_WORKERS']} cores={cores}")
+    print(f"status: {dict(statuses)}")
+    print(f"login/s: {per_second:.1f} ({per_second / cores:.1f} per core)")
+    print(f"/vegetable/list p95 selama login burst: {p95:.1f} ms ({len(catalog)} request)")
+
+
+if __name__ == "__main__":
+    main()
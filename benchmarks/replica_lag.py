@@ -0,0 +1,206 @@
+"""Replication-lag simulator and read-replica check on two local SQLite files.
+
+    python benchmarks/replica_lag.py [--lag 1.5] [--interval 0.1]
+
+``ReplicaSimulator`` copies a primary SQLite file into a replica file with
+the backup API, publishing every snapshot ``lag`` seconds after it was
+taken, like an asynchronous replica that is always ``lag`` behind. The
+script runs the app on a primary file with a ``reporting`` bind on the
+replica and checks that report reads come from the replica, that a buyer
+still sees their own fresh transaction (also one made in the same second
+as the last sync), that the admin listings read the primary right after an
+admin write and the replica again once it has caught up, that the replica
+refuses writes and that reports catch up once the lag has passed. Import the simulator to
+get the same setup elsewhere.
+"""
+import argparse
+import collections
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_config
+
+
+class ReplicaSimulator:
+    def __init__(self, primary, replica, lag=1.0, interval=0.1):
+        self.primary = primary
+        self.replica = replica
+        self.lag = lag
+        self.interval = interval
+        self.pending = collections.deque()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def snapshot(self):
+        """A consistent in-memory copy of the primary"""
+        copy = sqlite3.connect(":memory:", check_same_thread=False)
+        source = sqlite3.connect(self.primary, timeout=15)
+        try:
+            source.backup(copy)
+        finally:
+            source.close()
+        return copy
+
+    def publish(self, copy):
+        target = sqlite3.connect(self.replica, timeout=15)
+        try:
+            copy.backup(target)
+        finally:
+            target.close()
+            copy.close()
+
+    def sync(self):
+        """Catch the replica up right now"""
+        self.publish(self.snapshot())
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.pending.append((time.monotonic() + self.lag, self.snapshot()))
+            while self.pending and self.pending[0][0] <= time.monotonic():
+                self.publish(self.pending.popleft()[1])
+
+    def start(self):
+        self.sync()
+        self.thread = threading.Thread(target=self._run, name="replica-lag", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        while self.pending:
+            self.pending.popleft()[1].close()
+
+
+def check(label, ok):
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lag", type=float, default=1.5)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    primary = os.path.join(directory, "primary.db")
+    replica = os.path.join(directory, "replica.db")
+    config = get_config("prod")
+    config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + primary
+    config.SQLALCHEMY_BINDS = {"reporting": "sqlite:///" + replica}
+
+    from flask_jwt_extended import create_access_token
+    from werkzeug.security import generate_password_hash
+    from sqlalchemy import event
+    from app import create_app
+    from extensions import db
+    from models import Users, Vegetables
+    from user_cache import role_claims
+
+    app = create_app("prod")
+    with app.app_context():
+        db.create_all()
+        hashed = generate_password_hash("rahasia", app.config["PASSWORD_HASH_METHOD"])
+        admin = Users(name="Admin", email="admin@parisy.com", password=hashed, role="admin", sub_role="admin")
+        buyer = Users(name="Budi", email="budi@parisy.com", password=hashed, role="user", sub_role="warga")
+        other = Users(name="Siti", email="siti@parisy.com", password=hashed, role="user", sub_role="warga")
+        db.session.add_all([admin, buyer, other])
+        db.session.add(Vegetables(name="Wortel", price=1000, stock=1000, category="akar"))
+        db.session.commit()
+        headers = {
+            user.email: {"Authorization": "Bearer " + create_access_token(str(user.id), additional_claims=role_claims(user))}
+            for user in (admin, buyer, other)
+        }
+
+    simulator = ReplicaSimulator(primary, replica, args.lag, args.interval).start()
+    client = app.test_client()
+    order = {"items": [{"vegetable_id": 1, "quantity": 1}], "payment_method": "cash"}
+
+    def codes(email, path="/transaction/all"):
+        return {row["code"] for row in client.get(path, headers=headers[email]).get_json()["data"]}
+
+    def reported(email):
+        return client.get("/finance/summary", headers=headers[email]).get_json()["total_transactions"]
+
+    replica_reads = []
+
+    def count_replica_read(conn, cursor, statement, parameters, context, executemany):
+        # The replica's own write position is read on every check; count only the report itself
+        if "write_positions" not in statement:
+            replica_reads.append(statement)
+
+    with app.app_context():
+        event.listen(db.engines["reporting"], "before_cursor_execute", count_replica_read)
+
+    def admin_get(path):
+        """(body, read from the replica) of an admin listing"""
+        replica_reads.clear()
+        body = client.get(path, headers=headers["admin@parisy.com"]).get_json()
+        return body, bool(replica_reads)
+
+    def listings_from_replica():
+        return all(admin_get(path)[1] for path in ("/vegetable/admin/list", "/auth/all"))
+
+    results = []
+    try:
+        # Someone else's checkout: invisible to reports until the replica catches up
+        code = client.post("/transaction/create", headers=headers["siti@parisy.com"], json=order).get_json()["code"]
+        results.append(check("laporan admin dibaca dari replika (transaksi baru belum terlihat)",
+                             code not in codes("admin@parisy.com") and reported("admin@parisy.com") == 0))
+
+        # The buyer's own checkout: read-your-writes sends them to the primary
+        own = client.post("/transaction/create", headers=headers["budi@parisy.com"], json=order).get_json()["code"]
+        results.append(check("pembeli langsung melihat transaksinya sendiri", own in codes("budi@parisy.com")))
+
+        with app.app_context(), db.engines["reporting"].connect() as conn:
+            try:
+                conn.exec_driver_sql("DELETE FROM users")
+                writable = True
+            except Exception:
+                writable = False
+        results.append(check("bind reporting menolak penulisan", not writable))
+
+        deadline = time.monotonic() + args.lag * 4 + 2
+        while time.monotonic() < deadline and code not in codes("admin@parisy.com"):
+            time.sleep(0.1)
+        caught_up = code in codes("admin@parisy.com") and reported("admin@parisy.com") == 2
+        results.append(check(f"replika menyusul setelah ~{args.lag:g} s", caught_up))
+    finally:
+        simulator.stop()
+
+    # Without owner: any write to the listed table sends the listing to the primary
+    simulator.sync()
+    results.append(check("daftar admin (sayuran, pengguna) dibaca dari replika", listings_from_replica()))
+
+    client.put("/vegetable/update/1", headers=headers["admin@parisy.com"], json={"price": 1500})
+    body, from_replica = admin_get("/vegetable/admin/list")
+    results.append(check("daftar sayuran admin langsung melihat perubahan harga",
+                         not from_replica and float(body["data"][0]["price"]) == 1500))
+    client.put("/auth/edit/3", headers=headers["admin@parisy.com"], json={"name": "Siti Aminah"})
+    body, from_replica = admin_get("/auth/all")
+    results.append(check("daftar pengguna admin langsung melihat perubahan nama",
+                         not from_replica and "Siti Aminah" in {user["name"] for user in body["data"]}))
+
+    simulator.sync()
+    results.append(check("daftar admin kembali ke replika setelah menyusul", listings_from_replica()))
+
+    # A write in the same second as the sync the replica last received
+    simulator.sync()
+    same_second = client.post("/transaction/create", headers=headers["budi@parisy.com"], json=order).get_json()["code"]
+    results.append(check("transaksi pada detik yang sama dengan sinkronisasi terakhir terlihat",
+                         same_second in codes("budi@parisy.com")))
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
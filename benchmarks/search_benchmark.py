@@ -0,0 +1,111 @@
+"""Compare /vegetable/search before and after the FTS5 index.
+
+    python benchmarks/search_benchmark.py [--rows 100000] [--repeat 20]
+
+Builds a throwaway SQLite catalog, then times the old ``ilike('%q%')`` +
+Python sort implementation against ``search_index.search``.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+WORDS = [
+    "wortel", "bawang", "kentang", "kangkung", "kubis", "sawi", "tomat", "timun",
+    "cabai", "brokoli", "bayam", "selada", "terong", "labu", "jagung", "buncis",
+    "segar", "organik", "lokal", "manis", "pedas", "hijau", "merah", "putih",
+]
+QUERIES = ["wortel", "bro", "sawi putih", "organik segar", "kang", "xyz"]
+
+
+def build(rows, seed):
+    from extensions import db
+    from models import Users, Vegetables
+
+    rng = random.Random(seed)
+    admin = Users(name="Bench", email="bench@parisy.com", password="-", role="admin", sub_role="admin")
+    db.session.add(admin)
+    db.session.commit()
+
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+            "description": " ".join(rng.choices(WORDS, k=8)),
+            "price": rng.randint(1, 50) * 1000,
+            "stock": rng.randint(0, 200),
+            "category": rng.choice(['daun', 'akar', 'bunga', 'buah']),
+            "status": "available",
+            "created_by": admin.id,
+        })
+        if len(batch) == 10000:
+            db.session.execute(Vegetables.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Vegetables.__table__.insert(), batch)
+    db.session.commit()
+
+
+def old_search(q):
+    from models import Vegetables
+
+    vegetables = Vegetables.query.filter_by(status="available").filter(
+        (Vegetables.name.ilike(f"%{q}%")) |
+        (Vegetables.description.ilike(f"%{q}%"))
+    ).all()
+    vegetables.sort(key=lambda x: x.name)
+    return vegetables
+
+
+def new_search(q, limit):
+    import search_index
+    from models import Vegetables
+
+    return search_index.search(Vegetables.query.filter_by(status="available"), q, limit).all()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "search.db")
+    from app import create_app
+    from extensions import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        build(args.rows, args.seed)
+        print(f"{args.rows} sayuran dibuat dalam {time.perf_counter() - start:.1f}s")
+
+        limit = app.config["SEARCH_LIMIT_DEFAULT"]
+        print(f"{'query':<16}{'ilike (ms)':>12}{'fts5 (ms)':>12}{'speedup':>10}")
+        for q in QUERIES:
+            old = timed(lambda: old_search(q), args.repeat)
+            new = timed(lambda: new_search(q, limit), args.repeat)
+            db.session.remove()
+            print(f"{q:<16}{old:>12.1f}{new:>12.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Serialization cost of 50k transactions: ORM entities vs projected rows.
+
+    python benchmarks/serialization_benchmark.py [--transactions 50000] [--items 2] [--repeat 3]
+
+Fills a throwaway SQLite file, then times building the /transaction/all
+payload (with items) for every transaction two ways: the previous path
+(hydrated ORM objects with selectinload, standard-library JSON provider) and
+the current one (column-projected rows, FastJSONProvider). Both bodies are
+compared byte for byte before timings are printed.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_config
+
+
+def best_of(repeat, fn):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=50000)
+    parser.add_argument("--items", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config = get_config("prod")
+    config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "serialize.db")
+
+    from flask.json.provider import DefaultJSONProvider
+    from sqlalchemy import insert
+    from sqlalchemy.orm import selectinload
+    from app import create_app
+    from extensions import db
+    from models import DetailTransactions, Transactions, Users, Vegetables
+    from serializers import TRANSACTION_COLUMNS, detail_item_data, transaction_data, transactions_with_items
+
+    app = create_app("prod")
+    with app.app_context():
+        db.create_all()
+        user = Users(name="Bench", email="bench@parisy.com", password="-", role="user", sub_role="warga")
+        db.session.add(user)
+        db.session.add(Vegetables(name="Wortel", price=1250, stock=10, category="akar"))
+        db.session.commit()
+
+        started = datetime(2024, 1, 1)
+        db.session.execute(insert(Transactions), [
+            {
+                "code": f"TRX{i:016d}", "user_id": user.id, "total_price": 1250 * args.items,
+                "payment_method": "cash" if i % 2 else "transfer",
+                "transaction_status": ("pending", "completed", "cancelled")[i % 3],
+                "notes": None if i % 4 else f"catatan {i}",
+                "created_at": started + timedelta(seconds=i), "updated_at": started + timedelta(seconds=i, microseconds=500),
+            }
+            for i in range(args.transactions)
+        ])
+        db.session.execute(insert(DetailTransactions), [
+            {"transaction_id": i + 1, "vegetable_id": 1, "quantity": 1, "unit_price": 1250, "subtotal": 1250}
+            for i in range(args.transactions) for _ in range(args.items)
+        ])
+        db.session.commit()
+
+    stdlib = DefaultJSONProvider(app)
+
+    def orm_path():
+        transactions = Transactions.query.options(selectinload(Transactions.items)).order_by(
+            Transactions.created_at.desc(), Transactions.id.desc()
+        ).all()
+        data = []
+        for txn in transactions:
+            item = transaction_data(txn, include_user=True, include_timestamps=True)
+            item["items"] = [detail_item_data(d) for d in txn.items]
+            data.append(item)
+        body = stdlib.response({"data": data, "next_cursor": None}).get_data()
+        db.session.expunge_all()
+        return body
+
+    def projected_path():
+        transactions = Transactions.query.with_entities(*TRANSACTION_COLUMNS).order_by(
+            Transactions.created_at.desc(), Transactions.id.desc()
+        ).all()
+        data = transactions_with_items(transactions, include_user=True, include_timestamps=True)
+        return app.json.response({"data": data, "next_cursor": None}).get_data()
+
+    with app.app_context():
+        orm_time, orm_body = best_of(args.repeat, orm_path)
+        projected_time, projected_body = best_of(args.repeat, projected_path)
+
+    if orm_body != projected_body:
+        print("✗ output berbeda")
+        raise SystemExit(1)
+
+    print(f"{args.transactions} transaksi x {args.items} item, {len(orm_body) / 1e6:.1f} MB, output identik ✓")
+    print(f"ORM + json stdlib:          {orm_time * 1000:8.0f} ms")
+    print(f"kolom terproyeksi + orjson: {projected_time * 1000:8.0f} ms ({orm_time / projected_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
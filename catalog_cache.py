@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+
+
+class CatalogCache:
+    """In-process cache for the public vegetable catalog responses.
+
+    Entries are dropped by ``invalidate()`` after every catalog write and
+    otherwise live for ``CATALOG_CACHE_TTL`` seconds, which bounds how stale
+    another worker process can be. Every response carries a strong ETag of
+    its body so clients revalidate with ``If-None-Match`` and get a 304.
+    """
+
+    def __init__(self, app=None):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "not_modified": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CATALOG_CACHE_ENABLED", True)
+        app.config.setdefault("CATALOG_CACHE_SIZE", 512)
+        app.config.setdefault("CATALOG_CACHE_TTL", 30)
+        app.extensions["catalog_cache"] = self
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            body, etag, expires = entry
+            if time.monotonic() >= expires:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return body, etag
+
+    def set(self, key, body, etag, generation):
+        config = current_app.config
+        with self.lock:
+            # A write committed while this response was being built
+            if generation != self.generation:
+                return
+            self.entries[key] = (body, etag, time.monotonic() + config["CATALOG_CACHE_TTL"])
+            self.entries.move_to_end(key)
+            while len(self.entries) > config["CATALOG_CACHE_SIZE"]:
+                self.entries.popitem(last=False)
+
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.stats["invalidations"] += 1
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats, entries=len(self.entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _respond(self, body, etag):
+        response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+        response.set_etag(etag)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            self._count("not_modified")
+        return response
+
+    def cached(self, f):
+        """Serve a public catalog view from the cache with ETag revalidation"""
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            enabled = current_app.config["CATALOG_CACHE_ENABLED"]
+            key = request.full_path
+
+            if enabled:
+                entry = self.get(key)
+                if entry is not None:
+                    self._count("hits")
+                    return self._respond(*entry)
+                self._count("misses")
+
+            with self.lock:
+                generation = self.generation
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            body = response.get_data()
+            etag = hashlib.sha256(body).hexdigest()
+            if enabled:
+                self.set(key, body, etag, generation)
+            return self._respond(body, etag)
+        return decorated_function
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,305 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, select, update
+from extensions import db
+from models.vegetables import Vegetables
+from models.category_predictions import CategoryPredictions
+from catalog_cache import catalog_cache
+
+CATEGORIES = ['daun', 'akar', 'bunga', 'buah']
+
+
+class CategoryClassifier:
+    """Client for the category classifier.
+
+    Keeps one pooled keep-alive ``requests.Session``, remembers predictions
+    per image URL in an in-memory LRU backed by the ``category_predictions``
+    table (both expire after ``CATEGORY_CACHE_TTL`` seconds), and opens a
+    circuit breaker after ``CATEGORY_BREAKER_THRESHOLD`` consecutive failures
+    so calls fail fast for ``CATEGORY_BREAKER_COOLDOWN`` seconds.
+    """
+
+    def __init__(self):
+        self.session = None
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.stats = {"hits": 0, "misses": 0, "errors": 0, "open": 0}
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _session(self, config):
+        with self.lock:
+            if self.session is None:
+                # Imported on first use, it adds ~70 ms to every worker's startup
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=config["CATEGORY_CLASSIFIER_POOL_SIZE"]
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.session = session
+            return self.session
+
+    @staticmethod
+    def cache_key(image_url):
+        return hashlib.sha256(image_url.encode()).hexdigest()
+
+    def _cache_get(self, key, config):
+        ttl = timedelta(seconds=config["CATEGORY_CACHE_TTL"])
+        now = datetime.utcnow()
+
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                category, created_at = entry
+                if now - created_at < ttl:
+                    self.cache.move_to_end(key)
+                    return category
+                del self.cache[key]
+
+        table = CategoryPredictions.__table__
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                select(table.c.category, table.c.created_at).where(table.c.image_hash == key)
+            ).first()
+            if row is None:
+                return None
+            if now - row.created_at >= ttl:
+                conn.execute(delete(table).where(table.c.image_hash == key))
+                return None
+
+        self._remember(key, row.category, row.created_at, config)
+        return row.category
+
+    def _remember(self, key, category, created_at, config):
+        with self.lock:
+            self.cache[key] = (category, created_at)
+            self.cache.move_to_end(key)
+            while len(self.cache) > config["CATEGORY_CACHE_SIZE"]:
+                self.cache.popitem(last=False)
+
+    def _cache_put(self, key, image_url, category, config):
+        now = datetime.utcnow()
+        self._remember(key, category, now, config)
+        table = CategoryPredictions.__table__
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(delete(table).where(table.c.image_hash == key))
+                conn.execute(insert(table).values(
+                    image_hash=key, image_url=image_url, category=category, created_at=now
+                ))
+        except Exception as e:
+            print(f"Error caching predicted category: {str(e)}")
+
+    def purge_expired(self, config):
+        """Delete persisted predictions older than the TTL"""
+        cutoff = datetime.utcnow() - timedelta(seconds=config["CATEGORY_CACHE_TTL"])
+        table = CategoryPredictions.__table__
+        with db.engine.begin() as conn:
+            return conn.execute(delete(table).where(table.c.created_at < cutoff)).rowcount
+
+    def _allow_request(self, config):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            cooldown = config["CATEGORY_BREAKER_COOLDOWN"]
+            if not self.probing and time.monotonic() - self.opened_at >= cooldown:
+                # Half-open: let a single probe through
+                self.probing = True
+                return True
+            self.stats["open"] += 1
+            return False
+
+    def _record(self, ok, config):
+        with self.lock:
+            self.probing = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.stats["errors"] += 1
+            self.failures += 1
+            if self.failures >= config["CATEGORY_BREAKER_THRESHOLD"]:
+                self.opened_at = time.monotonic()
+
+    def predict(self, image_url):
+        config = current_app.config
+        key = self.cache_key(image_url)
+
+        category = self._cache_get(key, config)
+        if category is not None:
+            self._count("hits")
+            return category
+        self._count("misses")
+
+        if not self._allow_request(config):
+            return None
+
+        try:
+            response = self._session(config).post(
+                config["CATEGORY_CLASSIFIER_URL"],
+                json={"image_url": image_url},
+                timeout=config["CATEGORY_CLASSIFIER_TIMEOUT"]
+            )
+        except Exception as e:
+            self._record(False, config)
+            print(f"Error predicting category: {str(e)}")
+            return None
+
+        # 4xx means the classifier is up but rejected this image
+        self._record(response.status_code < 500, config)
+        if response.status_code != 200:
+            return None
+
+        try:
+            result = response.json()
+        except ValueError:
+            return None
+        predicted_category = result.get("category") or result.get("prediction")
+        if predicted_category not in CATEGORIES:
+            return None
+
+        self._cache_put(key, image_url, predicted_category, config)
+        return predicted_category
+
+    def snapshot(self):
+        with self.lock:
+            return dict(
+                self.stats,
+                breaker="open" if self.opened_at is not None else "closed",
+                cached=len(self.cache)
+            )
+
+
+classifier = CategoryClassifier()
+
+
+def predict_category_from_image(image_url):
+    return classifier.predict(image_url)
+
+
+class CategoryPredictor:
+    """Bounded background pool that predicts categories for pending vegetables.
+
+    Jobs beyond the pool size plus ``CATEGORY_PREDICTION_QUEUE_SIZE`` are
+    rejected and marked ``failed`` instead of queueing without limit.
+    """
+
+    def __init__(self, app=None):
+        self.executor = None
+        self.slots = None
+        self.lock = threading.Lock()
+        self.stats = {"queued": 0, "running": 0, "predicted": 0, "failed": 0, "rejected": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CATEGORY_PREDICTION_ASYNC", True)
+        app.config.setdefault("CATEGORY_PREDICTION_WORKERS", 2)
+        app.config.setdefault("CATEGORY_PREDICTION_QUEUE_SIZE", 32)
+        app.config.setdefault("CATEGORY_CLASSIFIER_POOL_SIZE", 4)
+        app.config.setdefault("CATEGORY_CACHE_SIZE", 1024)
+        app.config.setdefault("CATEGORY_CACHE_TTL", 7 * 24 * 3600)
+        app.config.setdefault("CATEGORY_BREAKER_THRESHOLD", 5)
+        app.config.setdefault("CATEGORY_BREAKER_COOLDOWN", 30)
+        app.extensions["category_predictor"] = self
+
+    def _executor(self, config):
+        with self.lock:
+            if self.executor is None:
+                workers = config["CATEGORY_PREDICTION_WORKERS"]
+                self.executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="category-predictor"
+                )
+                self.slots = threading.BoundedSemaphore(
+                    workers + config["CATEGORY_PREDICTION_QUEUE_SIZE"]
+                )
+            return self.executor
+
+    def _count(self, key, delta=1):
+        with self.lock:
+            self.stats[key] += delta
+
+    def submit(self, vegetable_id, image_url):
+        """Queue a prediction for a vegetable that was committed as pending"""
+        app = current_app._get_current_object()
+        if not app.config["CATEGORY_PREDICTION_ASYNC"]:
+            self._run(vegetable_id, image_url)
+            return
+
+        executor = self._executor(app.config)
+        if not self.slots.acquire(blocking=False):
+            self._count("rejected")
+            self._finish(vegetable_id, None)
+            return
+
+        self._count("queued")
+        try:
+            executor.submit(self._job, app, vegetable_id, image_url)
+        except RuntimeError:
+            self.slots.release()
+            self._count("queued", -1)
+            self._count("rejected")
+            self._finish(vegetable_id, None)
+
+    def _job(self, app, vegetable_id, image_url):
+        self._count("queued", -1)
+        self._count("running")
+        try:
+            with app.app_context():
+                self._run(vegetable_id, image_url)
+        finally:
+            self._count("running", -1)
+            self.slots.release()
+
+    def _run(self, vegetable_id, image_url):
+        category = predict_category_from_image(image_url)
+        self._finish(vegetable_id, category)
+        self._count("predicted" if category else "failed")
+
+    def _finish(self, vegetable_id, category):
+        # Only touch rows still pending, so a manual category set while the
+        # prediction was in flight is never overwritten
+        values = {"category_status": "failed", "updated_at": datetime.utcnow()}
+        if category:
+            values.update(category=category, category_status="predicted")
+        try:
+            db.session.execute(
+                update(Vegetables)
+                .where(Vegetables.id == vegetable_id, Vegetables.category_status == "pending")
+                .values(**values)
+            )
+            db.session.commit()
+            catalog_cache.invalidate()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error saving predicted category: {str(e)}")
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats["classifier"] = classifier.snapshot()
+        return stats
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+predictor = CategoryPredictor()
@@ -0,0 +1,100 @@
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+
+class Compression:
+    """gzip/brotli response compression applied in ``after_request``.
+
+    Bodies of a ``COMPRESS_MIMETYPES`` type are compressed when the client
+    accepts it and they are at least ``COMPRESS_MIN_SIZE`` bytes. Streamed
+    responses (exports) are compressed chunk by chunk as they are produced,
+    so memory stays flat. Strong ETags become weak, since the bytes on the
+    wire now depend on the negotiated encoding.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESS_ENABLED", True)
+        app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+        app.config.setdefault("COMPRESS_LEVEL", 6)
+        app.config.setdefault("COMPRESS_BROTLI_QUALITY", 4)
+        app.config.setdefault("COMPRESS_MIMETYPES", [
+            "application/json", "application/x-ndjson", "text/csv", "text/html", "text/plain"
+        ])
+        app.extensions["compression"] = self
+        app.after_request(self.after_request)
+
+    def encoding(self):
+        """Negotiate ``br`` or ``gzip`` from Accept-Encoding, or None"""
+        accept = request.accept_encodings
+        if brotli is not None and accept["br"]:
+            return "br"
+        if accept["gzip"]:
+            return "gzip"
+        return None
+
+    def compressor(self, encoding, config):
+        """``(compress, finish)`` callables for one response body"""
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=config["COMPRESS_BROTLI_QUALITY"])
+            return compressor.process, compressor.finish
+        # wbits 31 writes a gzip header and trailer
+        compressor = zlib.compressobj(config["COMPRESS_LEVEL"], zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    def _stream(self, chunks, source, compress, finish):
+        try:
+            for chunk in chunks:
+                data = compress(chunk)
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+
+    def after_request(self, response):
+        config = current_app.config
+        if (
+            not config["COMPRESS_ENABLED"]
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in config["COMPRESS_MIMETYPES"]
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = self.encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            compress, finish = self.compressor(encoding, config)
+            chunks, source = response.iter_encoded(), response.response
+            response.response = self._stream(chunks, source, compress, finish)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < config["COMPRESS_MIN_SIZE"]:
+                return response
+            compress, finish = self.compressor(encoding, config)
+            response.set_data(compress(data) + finish())
+
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compression = Compression()
@@ -0,0 +1,51 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, make_response, request
+from sqlalchemy import func, select
+from extensions import db
+
+
+def table_state(model):
+    """``(max(updated_at), row count)`` of ``model``'s table.
+
+    Two scalar subqueries rather than one aggregate, so SQLite answers max()
+    from the updated_at index and count() from the smallest index.
+    """
+    return db.session.query(
+        select(func.max(model.updated_at)).scalar_subquery(),
+        select(func.count()).select_from(model).scalar_subquery(),
+    ).one()
+
+
+def last_modified(model, scope=None):
+    """Answer conditional GETs of a list view from its table's state.
+
+    ``Last-Modified`` is the table's max(updated_at). The ETag also covers the
+    URL, the row count (so deletes change it) and ``scope()`` for views whose
+    rows depend on the caller. Only a matching If-None-Match gets 304, before
+    the view queries or serializes anything: If-Modified-Since alone cannot
+    see deletes. While max(updated_at) is in the current second another
+    write may still share it, so no 304 is sent then. Place it below the
+    auth and permission decorators.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            updated_at, count = table_state(model)
+            state = f"{request.full_path}|{scope() if scope else ''}|{updated_at}|{count}"
+            etag = hashlib.sha256(state.encode()).hexdigest()
+
+            settled = updated_at is None or updated_at < datetime.utcnow().replace(microsecond=0)
+            if settled and request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            if updated_at is not None:
+                response.last_modified = updated_at
+            return response
+        return decorated_function
+    return decorator
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 
 class Config:
@@ -7,3 +8,110 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     SECRET_KEY = "supersecretkey"
     SESSION_TYPE = "filesystem"
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 200
+    EXPORT_BATCH_SIZE = 1000
+    CATEGORY_CLASSIFIER_URL = "https://sukinnamz-klasifikasi-kategori-sayur.hf.space/predict"
+    CATEGORY_CLASSIFIER_TIMEOUT = 10
+    CATEGORY_PREDICTION_ASYNC = True
+    CATEGORY_PREDICTION_WORKERS = 2
+    CATEGORY_PREDICTION_QUEUE_SIZE = 32
+    CATEGORY_CLASSIFIER_POOL_SIZE = 4
+    CATEGORY_CACHE_SIZE = 1024
+    CATEGORY_CACHE_TTL = 7 * 24 * 3600
+    CATEGORY_BREAKER_THRESHOLD = 5
+    CATEGORY_BREAKER_COOLDOWN = 30
+    CATALOG_CACHE_ENABLED = True
+    CATALOG_CACHE_SIZE = 512
+    CATALOG_CACHE_TTL = 30
+    # /finance/timeseries: closed buckets are cached, this bounds cross-worker staleness
+    TIMESERIES_CACHE_TTL = 300
+    TIMESERIES_DEFAULT_BUCKETS = {"day": 30, "week": 12, "month": 12}
+    TIMESERIES_MAX_BUCKETS = 366
+    TOP_PRODUCTS_DEFAULT = 5
+    TOP_PRODUCTS_MAX = 50
+    SEARCH_LIMIT_DEFAULT = 50
+    SEARCH_LIMIT_MAX = 200
+    USER_CACHE_SIZE = 1024
+    USER_CACHE_TTL = 60
+    USER_ROLE_VERSION_REFRESH = 30
+    # New hashes use this method (Werkzeug's default scrypt); stored hashes
+    # with weaker parameters or a deprecated algorithm are upgraded on the
+    # next successful login
+    PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_QUEUE_SIZE = 16
+    PASSWORD_HASH_TIMEOUT = 10
+    # gzip (brotli too when installed) for responses at least this big
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+    # Applied on every new SQLite connection (see database.py)
+    SQLITE_PRAGMAS = {}
+    # Extra engines; a "reporting" bind is a read-only replica that report
+    # and admin listing reads go to (see reporting.py)
+    SQLALCHEMY_BINDS = {}
+    # Send a request to the primary when the replica lacks the caller's own writes
+    REPORTING_READ_YOUR_WRITES = True
+    # Prometheus metrics and Server-Timing (see metrics.py); with a token set,
+    # scrapes must send "Authorization: Bearer <token>"
+    METRICS_ENABLED = True
+    METRICS_PATH = "/metrics"
+    METRICS_TOKEN = None
+    SERVER_TIMING_HEADER = True
+    # N+1 / slow query logging (see query_guard.py), on in dev and test
+    QUERY_GUARD_ENABLED = False
+    QUERY_GUARD_REPEAT_THRESHOLD = 5
+    QUERY_GUARD_SLOW_MS = 100
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    QUERY_GUARD_ENABLED = True
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+    CATEGORY_PREDICTION_ASYNC = False
+    CATALOG_CACHE_ENABLED = False
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+    QUERY_GUARD_ENABLED = True
+
+
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///market.db")
+    JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", Config.JWT_SECRET_KEY)
+    SECRET_KEY = os.environ.get("SECRET_KEY", Config.SECRET_KEY)
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+    SQLALCHEMY_BINDS = (
+        {"reporting": os.environ["REPORTING_DATABASE_URL"]} if os.environ.get("REPORTING_DATABASE_URL") else {}
+    )
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": 30,
+        "connect_args": {"timeout": 15},
+    }
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "busy_timeout": 15000,
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    }
+
+
+config_by_name = {
+    "dev": DevelopmentConfig,
+    "test": TestingConfig,
+    "prod": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Config class for ``name`` or the APP_ENV environment variable (default: dev)"""
+    return config_by_name[name or os.environ.get("APP_ENV", "dev")]
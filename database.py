@@ -0,0 +1,46 @@
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# SQLALCHEMY_BINDS key of the read-only replica used for reports
+REPORTING_BIND = "reporting"
+
+
+class RoutingSession(Session):
+    """Sends reads to the ``reporting`` bind while ``info["reporting"]`` is set.
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary,
+    and so does everything when no reporting bind is configured.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.info.get("reporting")
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+        ):
+            engine = self._db.engines.get(REPORTING_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def apply_sqlite_pragmas(app, engine, read_only=False):
+    """Run ``SQLITE_PRAGMAS`` on every new connection of a SQLite engine.
+
+    ``read_only`` adds ``query_only``, so a replica can't be written through it.
+    """
+    pragmas = dict(app.config.get("SQLITE_PRAGMAS") or {})
+    if read_only:
+        pragmas["query_only"] = "ON"
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
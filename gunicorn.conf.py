@@ -0,0 +1,56 @@
+"""gunicorn settings for wsgi:app, overridable through the environment.
+
+The app is imported once in the master (preload_app) and workers are
+forked from it, so each worker starts serving without importing anything.
+Because the code is loaded in the master, a HUP only restarts workers on the
+same code. To deploy new code without dropping requests, send USR2 to the
+master (starts a new master + workers), then QUIT to the old one.
+"""
+import itertools
+import os
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 2))
+# gthread: blocking DB / classifier calls don't hold a whole worker
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+# In-flight requests get this long to finish on reload or shutdown
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+# Recycle workers now and then, jittered so they don't restart together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def pre_fork(server, worker):
+    # Lowest slot no live worker holds: a recycled worker takes over the
+    # slot of the one it replaces, so slots stay unique and bounded
+    taken = {getattr(other, "slot", None) for other in server.WORKERS.values()}
+    worker.slot = next(slot for slot in itertools.count() if slot not in taken)
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with workers
+    from wsgi import app
+    from extensions import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    # Unique transaction code worker id per live worker (pids can collide)
+    from transaction_code import generator, slot_worker_id
+    generator.assign(slot_worker_id(worker.slot))
+
+
+def worker_exit(server, worker):
+    # Let queued hashing / category predictions finish before the worker exits
+    from category_predictor import predictor
+    from password_hasher import password_hasher
+    password_hasher.shutdown(wait=True)
+    predictor.shutdown(wait=True)
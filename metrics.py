@@ -0,0 +1,164 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _labels(**labels):
+    """``{name="value",...}`` with values escaped for the text format"""
+    escaped = (
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metrics:
+    """Per-endpoint request latency, SQL count and SQL time.
+
+    ``before_request``/``after_request`` time each request and
+    ``before/after_cursor_execute`` listeners on every engine add each
+    statement's duration to the request that ran it. Totals are kept
+    in-process (per worker) and served in the Prometheus text format on
+    ``METRICS_PATH``; every response also gets a ``Server-Timing`` header.
+    Endpoints are labelled by URL rule, so ids don't multiply the series.
+    Time spent streaming a body (exports) after the view returns is not
+    included.
+    """
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.buckets = DEFAULT_BUCKETS
+        # (method, endpoint) -> [count per bucket..., count above the last, seconds, queries, db seconds]
+        self.series = {}
+        self.responses = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_PATH", "/metrics")
+        app.config.setdefault("METRICS_TOKEN", None)
+        app.config.setdefault("METRICS_BUCKETS", DEFAULT_BUCKETS)
+        app.config.setdefault("SERVER_TIMING_HEADER", True)
+        app.extensions["metrics"] = self
+        if not app.config["METRICS_ENABLED"]:
+            return
+
+        self.buckets = tuple(sorted(app.config["METRICS_BUCKETS"]))
+        # Registered before other after_request hooks (e.g. compression) so
+        # it runs after them and their time is included
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.add_url_rule(app.config["METRICS_PATH"], "metrics", self.view)
+
+        with app.app_context():
+            from extensions import db
+            for engine in db.engines.values():
+                if not event.contains(engine, "before_cursor_execute", self.before_cursor_execute):
+                    event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+                    event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_request(self):
+        g.metrics = [time.perf_counter(), 0, 0.0]
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["metrics_query_start"] = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("metrics_query_start", None)
+        if started is None or not has_request_context():
+            return
+        state = g.get("metrics")
+        if state is not None:
+            state[1] += 1
+            state[2] += time.perf_counter() - started
+
+    def after_request(self, response):
+        state = g.pop("metrics", None)
+        if state is None or request.endpoint == "metrics":
+            return response
+        started, queries, db_seconds = state
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+        self.observe(request.method, endpoint, response.status_code, elapsed, queries, db_seconds)
+
+        if current_app.config["SERVER_TIMING_HEADER"]:
+            response.headers["Server-Timing"] = (
+                f'app;dur={elapsed * 1000:.2f}, db;dur={db_seconds * 1000:.2f};desc="{queries} queries"'
+            )
+        return response
+
+    def observe(self, method, endpoint, status, seconds, queries, db_seconds):
+        buckets = len(self.buckets)
+        with self.lock:
+            series = self.series.get((method, endpoint))
+            if series is None:
+                series = self.series[(method, endpoint)] = [0] * (buckets + 1) + [0.0, 0, 0.0]
+            series[bisect_left(self.buckets, seconds)] += 1
+            series[buckets + 1] += seconds
+            series[buckets + 2] += queries
+            series[buckets + 3] += db_seconds
+            key = (method, endpoint, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self):
+        """The current totals in the Prometheus text exposition format"""
+        with self.lock:
+            series = {key: list(values) for key, values in self.series.items()}
+            responses = dict(self.responses)
+
+        buckets = len(self.buckets)
+        lines = [
+            "# HELP http_requests_total Requests by method, endpoint and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, endpoint, status), count in sorted(responses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, endpoint=endpoint, status=status)} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by method and endpoint.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, endpoint), values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(
+                    f"http_request_duration_seconds_bucket{_labels(method=method, endpoint=endpoint, le=bound)} {cumulative}"
+                )
+            count = cumulative + values[buckets]
+            labels = _labels(method=method, endpoint=endpoint)
+            inf = _labels(method=method, endpoint=endpoint, le="+Inf")
+            lines.append(f"http_request_duration_seconds_bucket{inf} {count}")
+            lines.append(f"http_request_duration_seconds_sum{labels} {values[buckets + 1]:.6f}")
+            lines.append(f"http_request_duration_seconds_count{labels} {count}")
+
+        for name, index, help_text, fmt in (
+            ("http_request_db_queries_total", buckets + 2, "SQL statements run by requests, by endpoint.", "d"),
+            ("http_request_db_seconds_total", buckets + 3, "Time spent in SQL statements, by endpoint.", ".6f"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, endpoint), values in sorted(series.items()):
+                lines.append(f"{name}{_labels(method=method, endpoint=endpoint)} {values[index]:{fmt}}")
+        return "\n".join(lines) + "\n"
+
+    def view(self):
+        token = current_app.config["METRICS_TOKEN"]
+        if token:
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return jsonify({"message": "Token metrics tidak valid"}), 401
+        return current_app.response_class(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+            self.responses.clear()
+
+
+metrics = Metrics()
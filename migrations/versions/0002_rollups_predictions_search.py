@@ -0,0 +1,75 @@
+"""finance rollups, category predictions and vegetable search index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 13:41:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases set up with `flask init-db` (create_all()) may already have
+    # the new tables before this migration runs
+    op.create_table('finance_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('transaction_status', sa.Enum('pending', 'completed', 'cancelled'), nullable=False),
+    sa.Column('total_price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'transaction_status'),
+    if_not_exists=True
+    )
+    op.create_table('category_predictions',
+    sa.Column('image_hash', sa.String(length=64), nullable=False),
+    sa.Column('image_url', sa.Text(), nullable=False),
+    sa.Column('category', sa.Enum('daun', 'akar', 'bunga', 'buah'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('image_hash'),
+    if_not_exists=True
+    )
+    columns = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('vegetables')]
+    if 'category_status' not in columns:
+        with op.batch_alter_table('vegetables', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('category_status', sa.Enum('manual', 'pending', 'predicted', 'failed'), nullable=True))
+            batch_op.alter_column('category',
+                   existing_type=sa.Enum('daun', 'akar', 'bunga', 'buah'),
+                   nullable=True)
+        op.execute("UPDATE vegetables SET category_status = 'manual'")
+
+    # Rebuild the rollup from existing transactions
+    op.execute("DELETE FROM finance_rollups")
+    op.execute(
+        "INSERT INTO finance_rollups (day, transaction_status, total_price, transaction_count) "
+        "SELECT date(created_at), transaction_status, SUM(total_price), COUNT(id) "
+        "FROM transactions WHERE transaction_status IS NOT NULL "
+        "GROUP BY date(created_at), transaction_status"
+    )
+
+    search_index.rebuild(op.get_bind())
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute(f"DROP TABLE IF EXISTS {search_index.FTS_TABLE}")
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {search_index.FTS_TABLE}_{suffix}")
+
+    with op.batch_alter_table('vegetables', schema=None) as batch_op:
+        batch_op.alter_column('category',
+               existing_type=sa.Enum('daun', 'akar', 'bunga', 'buah'),
+               nullable=False)
+        batch_op.drop_column('category_status')
+
+    op.drop_table('category_predictions')
+    op.drop_table('finance_rollups')
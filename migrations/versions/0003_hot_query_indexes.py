@@ -0,0 +1,41 @@
+"""hot query indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:37:16.780777
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_detail_transactions_transaction_id', 'detail_transactions', ['transaction_id']),
+    ('ix_detail_transactions_vegetable_id', 'detail_transactions', ['vegetable_id']),
+    ('ix_transactions_created_at_id', 'transactions', ['created_at', 'id']),
+    ('ix_transactions_status_created_at_id', 'transactions', ['transaction_status', 'created_at', 'id']),
+    ('ix_transactions_user_id_created_at_id', 'transactions', ['user_id', 'created_at', 'id']),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+    ('ix_users_sub_role_created_at_id', 'users', ['sub_role', 'created_at', 'id']),
+    ('ix_vegetables_category_status_name', 'vegetables', ['category', 'status', 'name']),
+    ('ix_vegetables_created_at_id', 'vegetables', ['created_at', 'id']),
+    ('ix_vegetables_name', 'vegetables', ['name']),
+    ('ix_vegetables_status_name', 'vegetables', ['status', 'name']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+    op.execute("ANALYZE")
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
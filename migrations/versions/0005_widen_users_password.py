@@ -0,0 +1,32 @@
+"""widen users.password for modern hash formats
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:52:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=100),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=100),
+               existing_nullable=False)
@@ -0,0 +1,32 @@
+"""updated_at indexes for Last-Modified checks
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_transactions_updated_at', 'transactions', ['updated_at']),
+    ('ix_users_updated_at', 'users', ['updated_at']),
+    ('ix_vegetables_updated_at', 'vegetables', ['updated_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,41 @@
+"""product sales aggregate
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_sales',
+    sa.Column('vegetable_id', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['vegetable_id'], ['vegetables.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('vegetable_id'),
+    if_not_exists=True
+    )
+
+    # Build the aggregate from existing completed transactions
+    op.execute("DELETE FROM product_sales")
+    op.execute(
+        "INSERT INTO product_sales (vegetable_id, units_sold, revenue) "
+        "SELECT d.vegetable_id, SUM(d.quantity), SUM(d.subtotal) "
+        "FROM detail_transactions d JOIN transactions t ON t.id = d.transaction_id "
+        "WHERE t.transaction_status = 'completed' "
+        "GROUP BY d.vegetable_id"
+    )
+
+
+def downgrade():
+    op.drop_table('product_sales')
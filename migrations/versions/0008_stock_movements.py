@@ -0,0 +1,49 @@
+"""stock movement ledger
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_movements',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('vegetable_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('restock', 'sale', 'adjustment', 'cancellation'), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('transaction_id', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('note', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['vegetable_id'], ['vegetables.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index('ix_stock_movements_vegetable_id_created_at_id', 'stock_movements',
+                    ['vegetable_id', 'created_at', 'id'], unique=False, if_not_exists=True)
+
+    # Open the ledger with the current stock of every vegetable that has none yet
+    op.execute(
+        "INSERT INTO stock_movements (vegetable_id, kind, quantity, note, created_at) "
+        "SELECT id, 'adjustment', stock, 'Saldo awal', CURRENT_TIMESTAMP FROM vegetables "
+        "WHERE COALESCE(stock, 0) != 0 "
+        "AND id NOT IN (SELECT vegetable_id FROM stock_movements)"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_stock_movements_vegetable_id_created_at_id', table_name='stock_movements', if_exists=True)
+    op.drop_table('stock_movements')
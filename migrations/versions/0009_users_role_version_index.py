@@ -0,0 +1,24 @@
+"""users role_version index for the role version refresh
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 17:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_role_version', 'users', ['role_version'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_users_role_version', table_name='users', if_exists=True)
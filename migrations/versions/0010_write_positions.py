@@ -0,0 +1,29 @@
+"""replica write positions
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('write_positions',
+    sa.Column('scope', sa.String(length=64), nullable=False),
+    sa.Column('position', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('scope'),
+    if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('write_positions')
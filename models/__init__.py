@@ -2,3 +2,8 @@ from .users import Users
 from .vegetables import Vegetables
 from .transactions import Transactions
 from .detail_transaction import DetailTransactions
+from .finance_rollups import FinanceRollups
+from .category_predictions import CategoryPredictions
+from .product_sales import ProductSales
+from .stock_movements import StockMovements
+from .write_positions import WritePositions
\ No newline at end of file
@@ -0,0 +1,7 @@
+from extensions import db
+
+class CategoryPredictions(db.Model):
+    image_hash = db.Column(db.String(64), primary_key=True)
+    image_url = db.Column(db.Text, nullable=False)
+    category = db.Column(db.Enum('daun', 'akar', 'bunga', 'buah'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
\ No newline at end of file
@@ -2,8 +2,11 @@ from extensions import db
 
 class DetailTransactions(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    transaction_id = db.Column(db.Integer, db.ForeignKey("transactions.id"))
-    vegetable_id = db.Column(db.Integer, db.ForeignKey("vegetables.id"))
+    transaction_id = db.Column(db.Integer, db.ForeignKey("transactions.id"), index=True)
+    vegetable_id = db.Column(db.Integer, db.ForeignKey("vegetables.id"), index=True)
     quantity = db.Column(db.Integer)
     unit_price = db.Column(db.Numeric(10, 2))
-    subtotal = db.Column(db.Numeric(10, 2))
\ No newline at end of file
+    subtotal = db.Column(db.Numeric(10, 2))
+
+    transaction = db.relationship("Transactions", back_populates="items")
+    vegetable = db.relationship("Vegetables", back_populates="details")
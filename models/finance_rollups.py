@@ -0,0 +1,27 @@
+from extensions import db
+from sqlalchemy import update
+
+class FinanceRollups(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    transaction_status = db.Column(db.Enum('pending', 'completed', 'cancelled'), primary_key=True)
+    total_price = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def apply(cls, day, status, amount, count):
+        """Add ``amount``/``count`` to the (day, status) bucket in the current DB transaction"""
+        result = db.session.execute(
+            update(cls)
+            .where(cls.day == day, cls.transaction_status == status)
+            .values(
+                total_price=cls.total_price + amount,
+                transaction_count=cls.transaction_count + count
+            )
+        )
+        if result.rowcount == 0:
+            db.session.add(cls(
+                day=day,
+                transaction_status=status,
+                total_price=amount,
+                transaction_count=count
+            ))
@@ -0,0 +1,39 @@
+from decimal import Decimal
+from extensions import db
+from sqlalchemy import func, select, update
+from .detail_transaction import DetailTransactions
+
+class ProductSales(db.Model):
+    """Units sold and revenue per vegetable over completed transactions"""
+    vegetable_id = db.Column(db.Integer, db.ForeignKey("vegetables.id", ondelete="CASCADE"), primary_key=True)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    @classmethod
+    def apply(cls, transaction_id, sign):
+        """Add (``sign=1``) or remove (``sign=-1``) a transaction's lines in the current DB transaction"""
+        lines = db.session.execute(
+            select(
+                DetailTransactions.vegetable_id,
+                func.sum(DetailTransactions.quantity),
+                func.sum(DetailTransactions.subtotal)
+            ).where(
+                DetailTransactions.transaction_id == transaction_id
+            ).group_by(DetailTransactions.vegetable_id)
+        ).all()
+        for vegetable_id, units, revenue in lines:
+            revenue = Decimal(str(revenue))
+            result = db.session.execute(
+                update(cls)
+                .where(cls.vegetable_id == vegetable_id)
+                .values(
+                    units_sold=cls.units_sold + sign * units,
+                    revenue=cls.revenue + sign * revenue
+                )
+            )
+            if result.rowcount == 0:
+                db.session.add(cls(
+                    vegetable_id=vegetable_id,
+                    units_sold=sign * units,
+                    revenue=sign * revenue
+                ))
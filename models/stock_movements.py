@@ -0,0 +1,44 @@
+from extensions import db
+from sqlalchemy import func, update
+from datetime import datetime
+from .vegetables import Vegetables
+
+class StockMovements(db.Model):
+    """Append-only stock ledger; Vegetables.stock is the cached sum of ``quantity``"""
+    __table_args__ = (
+        db.Index("ix_stock_movements_vegetable_id_created_at_id", "vegetable_id", "created_at", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    vegetable_id = db.Column(db.Integer, db.ForeignKey("vegetables.id", ondelete="CASCADE"), nullable=False)
+    kind = db.Column(db.Enum('restock', 'sale', 'adjustment', 'cancellation'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    transaction_id = db.Column(db.Integer, db.ForeignKey("transactions.id", ondelete="SET NULL"), nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    note = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, server_default=func.now())
+
+    @staticmethod
+    def move(vegetable_id, delta, expected=None):
+        """Add ``delta`` to the cached stock in SQL, never below zero; with ``expected``
+        only if the stock still equals it. Returns whether the row was updated."""
+        conditions = [Vegetables.id == vegetable_id]
+        if expected is not None:
+            conditions.append(Vegetables.stock == expected)
+        if delta < 0:
+            conditions.append(Vegetables.stock >= -delta)
+        result = db.session.execute(
+            update(Vegetables)
+            .where(*conditions)
+            .values(stock=Vegetables.stock + delta, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @classmethod
+    def record(cls, vegetable_id, kind, delta, expected=None, **fields):
+        """Append a movement and apply it to the cached stock in the current DB transaction"""
+        if not cls.move(vegetable_id, delta, expected):
+            return False
+        db.session.add(cls(vegetable_id=vegetable_id, kind=kind, quantity=delta, **fields))
+        return True
@@ -2,6 +2,13 @@ from extensions import db
 from sqlalchemy import func
 
 class Transactions(db.Model):
+    __table_args__ = (
+        db.Index("ix_transactions_created_at_id", "created_at", "id"),
+        db.Index("ix_transactions_updated_at", "updated_at"),
+        db.Index("ix_transactions_user_id_created_at_id", "user_id", "created_at", "id"),
+        db.Index("ix_transactions_status_created_at_id", "transaction_status", "created_at", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     code = db.Column(db.String(20), unique=True, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -11,3 +18,10 @@ class Transactions(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
+    items = db.relationship(
+        "DetailTransactions",
+        back_populates="transaction",
+        cascade="all, delete-orphan",
+        order_by="DetailTransactions.id"
+    )
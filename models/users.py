@@ -2,12 +2,20 @@ from extensions import db
 from sqlalchemy import func
 
 class Users(db.Model):
+    __table_args__ = (
+        db.Index("ix_users_created_at_id", "created_at", "id"),
+        db.Index("ix_users_updated_at", "updated_at"),
+        db.Index("ix_users_sub_role_created_at_id", "sub_role", "created_at", "id"),
+        db.Index("ix_users_role_version", "role_version"),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False, unique=True)
-    password = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.Enum('admin', 'user'), nullable=False)
     sub_role = db.Column(db.Enum('admin', 'bendahara', 'sekretaris', 'rw', 'rt', 'warga'), nullable=True)
+    role_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     address = db.Column(db.Text)
     phone = db.Column(db.String(20))
     created_at = db.Column(db.DateTime, server_default=func.now())
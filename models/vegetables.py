@@ -2,14 +2,24 @@ from extensions import db
 from sqlalchemy import func
 
 class Vegetables(db.Model):
+    __table_args__ = (
+        db.Index("ix_vegetables_status_name", "status", "name"),
+        db.Index("ix_vegetables_category_status_name", "category", "status", "name"),
+        db.Index("ix_vegetables_created_at_id", "created_at", "id"),
+        db.Index("ix_vegetables_updated_at", "updated_at"),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    name = db.Column(db.String(255), nullable=False)
+    name = db.Column(db.String(255), nullable=False, index=True)
     description = db.Column(db.Text)
     price = db.Column(db.Numeric(10, 2), nullable=False)
     stock = db.Column(db.Integer, default=0)
     image = db.Column(db.String(255), nullable=True)
-    category = db.Column(db.Enum('daun', 'akar', 'bunga', 'buah'), nullable=False)
+    category = db.Column(db.Enum('daun', 'akar', 'bunga', 'buah'), nullable=True)
+    category_status = db.Column(db.Enum('manual', 'pending', 'predicted', 'failed'), default='manual')
     status = db.Column(db.Enum('available', 'unavailable'), default='available')
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
+    details = db.relationship("DetailTransactions", back_populates="vegetable", passive_deletes=True)
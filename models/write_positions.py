@@ -0,0 +1,11 @@
+from extensions import db
+
+class WritePositions(db.Model):
+    """Commit positions for the replica read-your-writes check (see reporting.py).
+
+    ``*`` holds the position of the last tracked commit; ``<table>`` and
+    ``<table>:<owner id>`` the position of the last commit that wrote that
+    table or that owner's rows (``<table>:?`` when the owner is unknown).
+    """
+    scope = db.Column(db.String(64), primary_key=True)
+    position = db.Column(db.BigInteger, nullable=False, default=0)
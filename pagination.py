@@ -0,0 +1,81 @@
+import base64
+import json
+from flask import current_app, request
+from sqlalchemy import String, and_, or_, type_coerce
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, id):
+    raw = json.dumps([created_at, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        if not isinstance(created_at, str):
+            raise TypeError
+        return created_at, int(id)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def page_args():
+    """Read ``limit`` and ``cursor`` from the query string"""
+    default = current_app.config["PAGE_SIZE_DEFAULT"]
+    maximum = current_app.config["PAGE_SIZE_MAX"]
+    try:
+        limit = int(request.args.get("limit", default))
+    except ValueError:
+        limit = default
+    limit = max(1, min(limit, maximum))
+    return limit, request.args.get("cursor")
+
+
+def paginate(query, model, descending=False):
+    """Keyset-paginate ``query`` on ``(created_at, id)``.
+
+    The cursor carries ``created_at`` exactly as the database stores it, so
+    the seek predicate compares in the same domain as the ORDER BY and each
+    page costs one index range scan no matter how deep the client pages.
+    Returns ``(items, next_cursor)``; items are entities for ``Model.query``
+    and rows for column-projected queries. Raises ``InvalidCursor`` on a bad
+    cursor.
+    """
+    limit, cursor = page_args()
+    created_at = model.created_at
+
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(
+                created_at < last_created_at,
+                and_(created_at == last_created_at, model.id < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                created_at > last_created_at,
+                and_(created_at == last_created_at, model.id > last_id)
+            ))
+
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+
+    entity_query = [c["expr"] for c in query.column_descriptions] == [model]
+    rows = query.add_columns(created_at.label("cursor_created_at")).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(str(last.cursor_created_at), (last[0] if entity_query else last).id)
+
+    if entity_query:
+        return [row[0] for row in rows], next_cursor
+    return rows, next_cursor
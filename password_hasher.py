@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# Algorithms still fit for new hashes; stored hashes using any other are upgraded
+CURRENT_ALGORITHMS = {"scrypt", "pbkdf2:sha256", "pbkdf2:sha512"}
+
+
+def parse_method(method):
+    """(algorithm, cost parameters) of a Werkzeug hash method, Werkzeug's defaults filled in"""
+    name, *args = method.split(":")
+    if name == "scrypt":
+        return name, tuple(int(arg) for arg in args) if args else (2 ** 15, 8, 1)
+    if name == "pbkdf2":
+        digest = args[0] if args else "sha256"
+        return f"pbkdf2:{digest}", (int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS,)
+    return name, ()
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Password hashing on a bounded thread pool with config-driven parameters.
+
+    ``PASSWORD_HASH_METHOD`` (Werkzeug's ``scrypt:32768:8:1`` by default) is
+    the method for new hashes. A stored hash is upgraded on the next
+    successful login when it uses the same algorithm with weaker parameters,
+    or an algorithm no longer in ``CURRENT_ALGORITHMS``; a sound hash of
+    another algorithm is kept. At most ``PASSWORD_HASH_WORKERS`` hashes
+    run at once and ``PASSWORD_HASH_QUEUE_SIZE`` wait; beyond that callers
+    get ``HasherBusy`` instead of tying up more workers.
+    """
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+        app.config.setdefault("PASSWORD_HASH_WORKERS", 2)
+        app.config.setdefault("PASSWORD_HASH_QUEUE_SIZE", 16)
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 10)
+        app.extensions["password_hasher"] = self
+
+    def _executor(self, config):
+        with self.lock:
+            if self.executor is None:
+                workers = config["PASSWORD_HASH_WORKERS"]
+                self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+                self.slots = threading.BoundedSemaphore(workers + config["PASSWORD_HASH_QUEUE_SIZE"])
+            return self.executor
+
+    def _run(self, fn, *args):
+        config = current_app.config
+        executor = self._executor(config)
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = executor.submit(fn, *args)
+        except RuntimeError:
+            self.slots.release()
+            raise HasherBusy()
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=config["PASSWORD_HASH_TIMEOUT"])
+        except TimeoutError:
+            raise HasherBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, current_app.config["PASSWORD_HASH_METHOD"])
+
+    def verify(self, stored_hash, password):
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        algorithm, params = parse_method(stored_hash.split("$", 1)[0])
+        target, target_params = parse_method(current_app.config["PASSWORD_HASH_METHOD"])
+        if algorithm == target:
+            return any(have < want for have, want in zip(params, target_params))
+        return algorithm not in CURRENT_ALGORITHMS
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,22 @@
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+from user_cache import get_current_user
+
+
+def requires_permission(permission_check, error_msg="Anda tidak memiliki izin"):
+    """Authenticate, check ``permission_check(current_user)`` and pass the user to the view.
+
+    Place it above decorators that may answer on their own (e.g.
+    ``last_modified``), so a caller without permission always gets 403.
+    """
+    def decorator(f):
+        @wraps(f)
+        @jwt_required()
+        def decorated_function(*args, **kwargs):
+            current_user = get_current_user()
+            if not permission_check(current_user):
+                return jsonify({"message": error_msg}), 403
+            return f(current_user, *args, **kwargs)
+        return decorated_function
+    return decorator
@@ -0,0 +1,83 @@
+"""Opt-in pytest plugin failing tests that exceed a per-endpoint SQL query budget.
+
+Enable it with ``pytest -p query_budget`` or ``pytest_plugins = ["query_budget"]``
+in a conftest, run the app with ``QUERY_GUARD_ENABLED`` (on in the dev and
+test configs), then declare budgets per test::
+
+    @pytest.mark.query_budget({"GET /transaction/all": 3})
+    def test_all_transactions(client, query_budget):
+        client.get("/transaction/all", headers=admin)
+
+    def test_history(client, query_budget):
+        query_budget.limit("GET /transaction/history", 2)
+        ...
+
+Endpoints are ``"<METHOD> <url rule>"``. Besides budget overruns, the test
+fails on any N+1 finding (unless ``allow_n_plus_one=True``) and on budgets
+for endpoints the test never requested.
+"""
+import pytest
+from query_guard import query_guard, shorten
+
+
+class QueryBudget:
+    def __init__(self, budgets=None, allow_n_plus_one=False):
+        self.budgets = dict(budgets or {})
+        self.allow_n_plus_one = allow_n_plus_one
+        self.reports = []
+
+    def limit(self, endpoint, queries):
+        self.budgets[endpoint] = queries
+
+    def record(self, report):
+        self.reports.append(report)
+
+    def queries(self, endpoint):
+        """Statement count of every recorded request to ``endpoint``"""
+        return [report["queries"] for report in self.reports if report["endpoint"] == endpoint]
+
+    def violations(self):
+        problems = []
+        for endpoint, budget in self.budgets.items():
+            counts = self.queries(endpoint)
+            if not counts:
+                problems.append(f"{endpoint}: has a query budget but was never requested")
+            elif max(counts) > budget:
+                problems.append(f"{endpoint}: {max(counts)} queries, budget {budget}")
+        if not self.allow_n_plus_one:
+            for report in self.reports:
+                for finding in report["n_plus_one"]:
+                    problems.append(
+                        f"{report['endpoint']}: N+1, {finding['count']} x {shorten(finding['statement'])} "
+                        f"(from {finding['origin']})"
+                    )
+        return problems
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(budgets, allow_n_plus_one=False): per-endpoint SQL query budgets"
+    )
+
+
+@pytest.fixture
+def query_budget(request):
+    marker = request.node.get_closest_marker("query_budget")
+    budget = QueryBudget(*marker.args, **marker.kwargs) if marker else QueryBudget()
+    query_guard.subscribers.append(budget.record)
+    try:
+        yield budget
+    finally:
+        query_guard.subscribers.remove(budget.record)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # Checked right after the test body so overruns are failures, not teardown errors
+    result = yield
+    budget = getattr(item, "funcargs", {}).get("query_budget")
+    if isinstance(budget, QueryBudget):
+        problems = budget.violations()
+        if problems:
+            pytest.fail("Query budget exceeded:\n" + "\n".join(problems), pytrace=False)
+    return result
@@ -0,0 +1,130 @@
+import os
+import re
+import sys
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Expanded IN lists and literals, so "IN (?, ?)" and "IN (?, ?, ?)" match
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_SELECT_LIST = re.compile(r"^SELECT (?:DISTINCT )?.+? FROM ", re.DOTALL)
+
+
+def normalize(statement):
+    """The statement with its parameters and literals blanked out"""
+    statement = _IN_LIST.sub("(?)", statement)
+    statement = _LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def shorten(statement, width=300):
+    """One-line statement for logs, with the SELECT column list elided"""
+    statement = _SELECT_LIST.sub("SELECT ... FROM ", _WHITESPACE.sub(" ", statement).strip(), count=1)
+    return statement if len(statement) <= width else statement[:width] + "..."
+
+
+class QueryGuard:
+    """Development/test detector for N+1 and slow queries.
+
+    Records every SQL statement a request runs together with the app frame
+    that issued it. After the request, a statement shape repeated at least
+    ``QUERY_GUARD_REPEAT_THRESHOLD`` times (an N+1 signature) and any
+    statement slower than ``QUERY_GUARD_SLOW_MS`` is logged with the route
+    and origin. Reports are also handed to ``subscribers`` (the pytest
+    ``query_budget`` fixture). Walking the stack per statement is too costly
+    for production, so it is off there.
+    """
+
+    def __init__(self, app=None):
+        self.subscribers = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("QUERY_GUARD_ENABLED", False)
+        app.config.setdefault("QUERY_GUARD_REPEAT_THRESHOLD", 5)
+        app.config.setdefault("QUERY_GUARD_SLOW_MS", 100)
+        app.extensions["query_guard"] = self
+        if not app.config["QUERY_GUARD_ENABLED"]:
+            return
+
+        self.root = app.root_path + os.sep
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        with app.app_context():
+            from extensions import db
+            for engine in db.engines.values():
+                if not event.contains(engine, "before_cursor_execute", self.before_cursor_execute):
+                    event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+                    event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_request(self):
+        g.query_log = []
+
+    def origin(self):
+        """``file:line (function)`` of the innermost app frame, skipping this module"""
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(self.root) and filename != __file__ and "site-packages" not in filename:
+                return f"{os.path.relpath(filename, self.root)}:{frame.f_lineno} ({frame.f_code.co_name})"
+            frame = frame.f_back
+        return "?"
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_guard_start"] = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_guard_start", None)
+        if started is None or not has_request_context():
+            return
+        log = g.get("query_log")
+        if log is not None:
+            log.append((statement, time.perf_counter() - started, self.origin()))
+
+    def analyze(self, log):
+        """``(n_plus_one, slow)`` findings for one request's statement log"""
+        config = current_app.config
+        shapes = Counter(normalize(statement) for statement, _, _ in log)
+        origins = {}
+        for statement, _, origin in log:
+            origins.setdefault(normalize(statement), origin)
+        n_plus_one = [
+            {"statement": shape, "count": count, "origin": origins[shape]}
+            for shape, count in shapes.items() if count >= config["QUERY_GUARD_REPEAT_THRESHOLD"]
+        ]
+        slow = [
+            {"statement": statement, "ms": round(seconds * 1000, 2), "origin": origin}
+            for statement, seconds, origin in log if seconds * 1000 >= config["QUERY_GUARD_SLOW_MS"]
+        ]
+        return n_plus_one, slow
+
+    def after_request(self, response):
+        log = g.pop("query_log", None)
+        if log is None:
+            return response
+        endpoint = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        n_plus_one, slow = self.analyze(log)
+
+        logger = current_app.logger
+        for finding in n_plus_one:
+            logger.warning(
+                "N+1 in %s: %d x %s (from %s)",
+                endpoint, finding["count"], shorten(finding["statement"]), finding["origin"]
+            )
+        for finding in slow:
+            logger.warning(
+                "Slow query in %s: %.1f ms %s (from %s)",
+                endpoint, finding["ms"], shorten(finding["statement"]), finding["origin"]
+            )
+
+        report = {"endpoint": endpoint, "queries": len(log), "n_plus_one": n_plus_one, "slow": slow}
+        for subscriber in list(self.subscribers):
+            subscriber(report)
+        return response
+
+
+query_guard = QueryGuard()
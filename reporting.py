@@ -0,0 +1,145 @@
+from functools import wraps
+from itertools import chain
+from flask import current_app
+from sqlalchemy import event, func, insert, select, update
+from database import REPORTING_BIND, RoutingSession
+from extensions import db
+from models.write_positions import WritePositions
+from user_cache import get_current_user
+
+GLOBAL_SCOPE = "*"
+UNKNOWN_OWNER = "?"
+WRITTEN = "reporting_written"
+
+
+class Reporting:
+    """Routes report reads to the read-only ``reporting`` bind.
+
+    ``read(model, owner=None)`` sends a view's queries to the replica unless
+    the replica has not caught up with writes the caller must see: with
+    ``owner`` (e.g. ``Transactions.user_id``) the caller's own rows of
+    ``model``; without it, any row. Those requests read the primary instead
+    (read-your-writes). The flag lives on the request's session and is
+    cleared at teardown, so streamed exports keep reading the replica. Place
+    it below the auth decorator and above ``last_modified``, so the ETag and
+    the body come from the same database.
+
+    "Caught up" is decided on commit positions, not timestamps: while a
+    reporting bind is configured, every commit that writes a table read
+    through ``read()`` advances the ``*`` row of ``write_positions`` and
+    stamps the new position on the scopes it wrote, in the same transaction.
+    The replica holds every commit up to its own ``*`` position, so a scope
+    is behind exactly when its position on the primary is greater.
+    """
+
+    def __init__(self, app=None):
+        self.tables = set()
+        self.owners = {}
+        self.listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("REPORTING_READ_YOUR_WRITES", True)
+        app.extensions["reporting"] = self
+        app.teardown_request(self.teardown_request)
+        if not self.listening:
+            self.listening = True
+            event.listen(RoutingSession, "after_flush", self.after_flush)
+            event.listen(RoutingSession, "do_orm_execute", self.orm_execute)
+            event.listen(RoutingSession, "before_commit", self.before_commit)
+            event.listen(RoutingSession, "after_rollback", self.after_rollback)
+
+    def teardown_request(self, exc):
+        if db.session.registry.has():
+            db.session.info.pop("reporting", None)
+
+    def mark(self, session, table, owner_id=None):
+        """Remember that the current transaction wrote ``table`` (rows of ``owner_id``)"""
+        if table not in self.tables:
+            return
+        written = session.info.setdefault(WRITTEN, set())
+        written.add(table)
+        if table in self.owners:
+            written.add(f"{table}:{UNKNOWN_OWNER if owner_id is None else owner_id}")
+
+    def after_flush(self, session, flush_context):
+        for instance in chain(session.new, session.dirty, session.deleted):
+            table = instance.__table__.name
+            owner = self.owners.get(table)
+            self.mark(session, table, getattr(instance, owner) if owner else None)
+
+    def orm_execute(self, orm_execute_state):
+        # Bulk INSERT/UPDATE/DELETE skip the flush; their owners are unknown
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            self.mark(orm_execute_state.session, orm_execute_state.statement.table.name)
+
+    def after_rollback(self, session):
+        session.info.pop(WRITTEN, None)
+
+    def before_commit(self, session):
+        if not self.tables:
+            return
+        session.flush()
+        written = session.info.pop(WRITTEN, None)
+        if written and REPORTING_BIND in session._db.engines:
+            self.advance(session, written)
+
+    def advance(self, session, scopes):
+        """Take the next commit position and stamp it on ``scopes``"""
+        primary = {"bind": session._db.engines[None]}
+
+        def stamp(scope, position, value):
+            result = session.execute(
+                update(WritePositions).where(WritePositions.scope == scope).values(position=value),
+                bind_arguments=primary
+            )
+            if result.rowcount == 0:
+                session.execute(
+                    insert(WritePositions).values(scope=scope, position=position), bind_arguments=primary
+                )
+
+        # Updating the * row takes the write lock, so positions follow commit order
+        stamp(GLOBAL_SCOPE, 1, WritePositions.position + 1)
+        position = session.execute(
+            select(WritePositions.position).where(WritePositions.scope == GLOBAL_SCOPE), bind_arguments=primary
+        ).scalar_one()
+        for scope in scopes:
+            stamp(scope, position, position)
+
+    def replica_behind(self, model, owner=None):
+        """Whether the primary has commits to ``model`` (the caller's rows, with ``owner``) the replica lacks"""
+        table = model.__table__.name
+        if owner is not None:
+            scopes = [f"{table}:{get_current_user().id}", f"{table}:{UNKNOWN_OWNER}"]
+        else:
+            scopes = [table]
+        replicated = db.session.execute(
+            select(WritePositions.position).where(WritePositions.scope == GLOBAL_SCOPE),
+            bind_arguments={"bind": db.engines[REPORTING_BIND]}
+        ).scalar()
+        written = db.session.execute(
+            select(func.max(WritePositions.position)).where(WritePositions.scope.in_(scopes)),
+            bind_arguments={"bind": db.engines[None]}
+        ).scalar()
+        return (written or 0) > (replicated or 0)
+
+    def read(self, model, owner=None):
+        table = model.__table__.name
+        self.tables.add(table)
+        if owner is not None:
+            self.owners[table] = owner.key
+
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if REPORTING_BIND in db.engines and not (
+                    current_app.config["REPORTING_READ_YOUR_WRITES"] and self.replica_behind(model, owner)
+                ):
+                    db.session.info["reporting"] = True
+                return f(*args, **kwargs)
+            return decorated_function
+        return decorator
+
+
+reporting = Reporting()
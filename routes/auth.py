@@ -1,28 +1,26 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, request, jsonify
 from extensions import db
 from models.users import Users
-from werkzeug.security import generate_password_hash, check_password_hash
+from password_hasher import password_hasher
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from pagination import paginate
+from user_cache import get_current_user, role_claims, user_cache
+from serializers import USER_COLUMNS, user_data
+from conditional import last_modified
+from permissions import requires_permission
+from reporting import reporting
 
 auth_bp = Blueprint("auth", __name__)
 
-def user_data(user, data_full=False):
-    data = {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "password": user.password,
-        "role": user.role,
-        "sub_role": user.sub_role
-    }
-    if data_full:
-        data.update({
-            "address": user.address,
-            "phone": user.phone,
-            "created_at": user.created_at,
-            "updated_at": user.updated_at
-        })
-    return data
+# Sub-roles that may list users, and which sub-roles each of them sees (None: all)
+USER_LIST_SCOPES = {
+    'admin': None,
+    'rw': ['warga', 'rt', 'rw'],
+    'rt': ['warga'],
+}
+
+def can_list_users(user):
+    return user.sub_role in USER_LIST_SCOPES
 
 @auth_bp.post("/register")
 def register():
@@ -31,7 +29,7 @@ def register():
     if Users.query.filter_by(email=data["email"]).first():
         return jsonify({"message": "Email sudah terdaftar"}), 409
     
-    hashed = generate_password_hash(data["password"])
+    hashed = password_hasher.hash(data["password"])
 
     user = Users(
         name=data["name"],
@@ -53,12 +51,16 @@ def login():
     data = request.get_json()
     user = Users.query.filter_by(email=data["email"]).first()
 
-    if not user or not check_password_hash(user.password, data["password"]):
+    if not user or not password_hasher.verify(user.password, data["password"]):
         return jsonify({"message": "Email atau password salah"}), 401
 
+    if password_hasher.needs_rehash(user.password):
+        user.password = password_hasher.hash(data["password"])
+        db.session.commit()
+
     return jsonify({
         "message": "Login berhasil",
-        "token": create_access_token(identity=str(user.id)),
+        "token": create_access_token(identity=str(user.id), additional_claims=role_claims(user)),
         "user": user_data(user)
     }), 200
 
@@ -79,10 +81,12 @@ def logout():
 @auth_bp.get("/profile/<int:id>")
 @jwt_required()
 def profile(id):
-    user = Users.query.get_or_404(id)
+    user = Users.query.with_entities(*USER_COLUMNS).filter_by(id=id).first()
+    if user is None:
+        abort(404)
     
-    current_user_id = get_jwt_identity()
-    current_user = Users.query.get(int(current_user_id))
+    current_user = get_current_user()
+    current_user_id = current_user.id
     
     if str(current_user_id) != str(id) and current_user.role not in ['admin', 'rw'] and current_user.sub_role != 'rt':
         return jsonify({"message": "Unauthorized"}), 403
@@ -90,23 +94,20 @@ def profile(id):
     return jsonify(user_data(user, data_full=True)), 200
 
 @auth_bp.get("/all")
-@jwt_required()
-def all_users():
-    current_user_id = get_jwt_identity()
-    current_user = Users.query.get(int(current_user_id))
+@requires_permission(can_list_users, "Unauthorized")
+@reporting.read(Users)
+@last_modified(Users, scope=lambda: get_current_user().sub_role)
+def all_users(current_user):
+    query = Users.query.with_entities(*USER_COLUMNS)
+    sub_roles = USER_LIST_SCOPES[current_user.sub_role]
+    if sub_roles is not None:
+        query = query.filter(Users.sub_role.in_(sub_roles))
     
-    if current_user.sub_role == 'admin':
-        users = Users.query.all()
-    elif current_user.sub_role == 'rw':
-        users = Users.query.filter(
-            Users.sub_role.in_(['warga', 'rt', 'rw'])
-        ).all()
-    elif current_user.sub_role == 'rt':
-        users = Users.query.filter_by(sub_role='warga').all()
-    else:
-        return jsonify({"message": "Unauthorized"}), 403
-    
-    return jsonify([user_data(user, data_full=True) for user in users]), 200
+    users, next_cursor = paginate(query, Users)
+    return jsonify({
+        "data": [user_data(user, data_full=True) for user in users],
+        "next_cursor": next_cursor
+    }), 200
 
 @auth_bp.put("/edit/<int:id>")
 @jwt_required()
@@ -114,8 +115,8 @@ def edit(id):
     data = request.get_json()
     user = Users.query.get_or_404(id)
     
-    current_user_id = get_jwt_identity()
-    current_user = Users.query.get(int(current_user_id))
+    current_user = get_current_user()
+    current_user_id = current_user.id
     
     if str(current_user_id) != str(id) and current_user.sub_role != 'admin':
         return jsonify({"message": "Hanya admin yang dapat mengedit pengguna lain"}), 403
@@ -132,13 +133,20 @@ def edit(id):
     if "phone" in data:
         user.phone = data["phone"]
     if "password" in data and data["password"]:
-        user.password = generate_password_hash(data["password"])
-    if "role" in data and current_user.sub_role == 'admin':
+        user.password = password_hasher.hash(data["password"])
+    role_changed = False
+    if "role" in data and current_user.sub_role == 'admin' and data["role"] != user.role:
         user.role = data["role"]
-    if "sub_role" in data and current_user.sub_role == 'admin':
+        role_changed = True
+    if "sub_role" in data and current_user.sub_role == 'admin' and data["sub_role"] != user.sub_role:
         user.sub_role = data["sub_role"]
+        role_changed = True
+    if role_changed:
+        # Tokens issued before this change carry stale role claims
+        user.role_version = (user.role_version or 0) + 1
     
     db.session.commit()
+    user_cache.invalidate(user.id, user.role_version if role_changed else None)
     return jsonify({
         "message": "Profil berhasil diperbarui",
         "user": user_data(user)
@@ -149,12 +157,12 @@ def edit(id):
 def delete(id):
     user = Users.query.get_or_404(id)
     
-    current_user_id = get_jwt_identity()
-    current_user = Users.query.get(int(current_user_id))
+    current_user = get_current_user()
     
     if current_user.sub_role != 'admin':
         return jsonify({"message": "Hanya admin yang dapat menghapus pengguna"}), 403
     
     db.session.delete(user)
     db.session.commit()
+    user_cache.revoke(id)
     return jsonify({"message": "Akun berhasil dihapus"}), 200
\ No newline at end of file
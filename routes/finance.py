@@ -1,84 +1,386 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from extensions import db
 from models.transactions import Transactions
+from models.finance_rollups import FinanceRollups
+from models.detail_transaction import DetailTransactions
+from models.product_sales import ProductSales
+from models.vegetables import Vegetables
 from flask_jwt_extended import jwt_required
-from sqlalchemy import func
+from sqlalchemy import Float, cast, func, insert, select
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import click
+import csv
+import io
+import json
+from pagination import paginate, InvalidCursor
+from serializers import TRANSACTION_COLUMNS, history_data
+from reporting import reporting
+from timeseries import GRANULARITIES, bucket_start, buckets_between, timeseries_cache
 
 finance_bp = Blueprint("finance", __name__)
 
 
+def summary_data(totals):
+    """Build the summary payload from ``{status: (total_price, count)}``"""
+    def total(status):
+        return totals.get(status, (0, 0))[0] or 0
+
+    def count(status):
+        return totals.get(status, (0, 0))[1] or 0
+
+    return {
+        "total_income": str(total('completed')),
+        "total_pending": str(total('pending')),
+        "total_cancelled": str(total('cancelled')),
+        "total_transactions": sum(count for _, count in totals.values()),
+        "completed_count": count('completed'),
+        "pending_count": count('pending'),
+        "cancelled_count": count('cancelled')
+    }
+
+
+def live_totals():
+    """Totals per status in one grouped aggregate over Transactions"""
+    rows = db.session.query(
+        Transactions.transaction_status,
+        func.sum(Transactions.total_price),
+        func.count(Transactions.id)
+    ).group_by(Transactions.transaction_status).all()
+    return {status: (total, count) for status, total, count in rows}
+
+
+def rollup_totals():
+    """Totals per status read from the per-day rollup (O(days))"""
+    rows = db.session.query(
+        FinanceRollups.transaction_status,
+        func.sum(FinanceRollups.total_price),
+        func.sum(FinanceRollups.transaction_count)
+    ).group_by(FinanceRollups.transaction_status).all()
+    return {status: (total, count) for status, total, count in rows}
+
+
 @finance_bp.get("/summary")
 @jwt_required()
+@reporting.read(Transactions, owner=Transactions.user_id)
 def summary():
     try:
-        # Total pendapatan (transaksi completed)
-        total_income = db.session.query(func.sum(Transactions.total_price)).filter(
-            Transactions.transaction_status == 'completed'
-        ).scalar() or 0
-
-        # Total transaksi pending
-        total_pending = db.session.query(func.sum(Transactions.total_price)).filter(
-            Transactions.transaction_status == 'pending'
-        ).scalar() or 0
-
-        # Total transaksi cancelled
-        total_cancelled = db.session.query(func.sum(Transactions.total_price)).filter(
-            Transactions.transaction_status == 'cancelled'
-        ).scalar() or 0
-
-        # Jumlah transaksi
-        total_transactions = Transactions.query.count()
-        completed_count = Transactions.query.filter_by(transaction_status='completed').count()
-        pending_count = Transactions.query.filter_by(transaction_status='pending').count()
-        cancelled_count = Transactions.query.filter_by(transaction_status='cancelled').count()
-
-        result = {
-            "total_income": str(total_income),
-            "total_pending": str(total_pending),
-            "total_cancelled": str(total_cancelled),
-            "total_transactions": total_transactions,
-            "completed_count": completed_count,
-            "pending_count": pending_count,
-            "cancelled_count": cancelled_count
-        }
-        return jsonify(result)
+        return jsonify(summary_data(rollup_totals()))
     except Exception as e:
         return jsonify({"message": f"Error: {str(e)}"}), 500
 
 
+def rebuild_rollups():
+    """Regenerate finance_rollups from Transactions in one INSERT ... SELECT"""
+    day = func.date(Transactions.created_at)
+    FinanceRollups.query.delete()
+    db.session.execute(
+        insert(FinanceRollups).from_select(
+            ["day", "transaction_status", "total_price", "transaction_count"],
+            db.session.query(
+                day,
+                Transactions.transaction_status,
+                func.sum(Transactions.total_price),
+                func.count(Transactions.id)
+            ).filter(
+                Transactions.transaction_status.isnot(None)
+            ).group_by(day, Transactions.transaction_status)
+        )
+    )
+    db.session.commit()
+
+
+@finance_bp.cli.command("rebuild-rollup")
+def rebuild_rollup():
+    """Regenerate finance_rollups from Transactions and verify it"""
+    rebuild_rollups()
+
+    live = summary_data(live_totals())
+    rollup = summary_data(rollup_totals())
+    mismatched = [key for key in live if Decimal(str(live[key])) != Decimal(str(rollup[key]))]
+    if mismatched:
+        for key in mismatched:
+            click.echo(f"✗ {key}: live={live[key]} rollup={rollup[key]}")
+        raise SystemExit(1)
+
+    days = db.session.query(func.count(func.distinct(FinanceRollups.day))).scalar()
+    click.echo(f"✓ Rollup dibangun ulang: {days} hari, {live['total_transactions']} transaksi")
+
+
+EXPORT_FIELDS = [
+    "id", "code", "user_id", "total_price", "payment_method",
+    "transaction_status", "notes", "created_at", "updated_at"
+]
+
+
+def history_query():
+    """Transactions filtered by the status/start_date/end_date query params"""
+    status_filter = request.args.get('status')  # pending, completed, cancelled
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+
+    query = Transactions.query.with_entities(*TRANSACTION_COLUMNS)
+
+    if status_filter:
+        query = query.filter(Transactions.transaction_status == status_filter)
+    if start_date:
+        query = query.filter(Transactions.created_at >= start_date)
+    if end_date:
+        query = query.filter(Transactions.created_at <= end_date)
+
+    return query
+
+
 @finance_bp.get("/history")
 @jwt_required()
+@reporting.read(Transactions, owner=Transactions.user_id)
 def history():
     try:
-        # Query parameters untuk filter
-        status_filter = request.args.get('status')  # pending, completed, cancelled
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
+        transactions, next_cursor = paginate(history_query(), Transactions, descending=True)
+        result = [history_data(txn) for txn in transactions]
+        return jsonify({"data": result, "next_cursor": next_cursor})
+    except InvalidCursor:
+        return jsonify({"message": "Cursor tidak valid"}), 400
+    except Exception as e:
+        return jsonify({"message": f"Error: {str(e)}"}), 500
 
-        query = Transactions.query
 
-        if status_filter:
-            query = query.filter(Transactions.transaction_status == status_filter)
-        if start_date:
-            query = query.filter(Transactions.created_at >= start_date)
-        if end_date:
-            query = query.filter(Transactions.created_at <= end_date)
+@finance_bp.get("/history/export")
+@jwt_required()
+@reporting.read(Transactions, owner=Transactions.user_id)
+def history_export():
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({"message": "Format harus 'csv' atau 'ndjson'"}), 400
+
+    # yield_per keeps a server-side cursor open and hydrates rows in
+    # batches, so memory stays flat however many rows are exported
+    transactions = history_query().order_by(
+        Transactions.created_at.desc(), Transactions.id.desc()
+    ).yield_per(current_app.config["EXPORT_BATCH_SIZE"])
 
-        transactions = query.order_by(Transactions.created_at.desc()).all()
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for txn in transactions:
+            writer.writerow(history_data(txn))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
 
-        result = []
+    def generate_ndjson():
         for txn in transactions:
-            result.append({
-                "id": txn.id,
-                "code": txn.code,
-                "user_id": txn.user_id,
-                "total_price": str(txn.total_price),
-                "payment_method": txn.payment_method,
-                "transaction_status": txn.transaction_status,
-                "notes": txn.notes,
-                "created_at": txn.created_at.isoformat() if txn.created_at else None,
-                "updated_at": txn.updated_at.isoformat() if txn.updated_at else None
+            yield json.dumps(history_data(txn)) + "\n"
+
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), "text/csv"
+    else:
+        body, mimetype = generate_ndjson(), "application/x-ndjson"
+
+    filename = f"finance-history-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+def parse_date(value):
+    """``YYYY-MM-DD`` (a longer ISO timestamp is cut to its date), or None"""
+    return date.fromisoformat(value[:10]) if value else None
+
+
+@finance_bp.get("/timeseries")
+@jwt_required()
+@reporting.read(Transactions, owner=Transactions.user_id)
+def timeseries():
+    config = current_app.config
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return jsonify({"message": "Granularity harus 'day', 'week' atau 'month'"}), 400
+    status_filter = request.args.get('status')  # pending, completed, cancelled
+    if status_filter and status_filter not in Transactions.transaction_status.type.enums:
+        return jsonify({"message": "Status tidak valid"}), 400
+    try:
+        start_date = parse_date(request.args.get('start_date'))
+        end_date = parse_date(request.args.get('end_date'))
+    except ValueError:
+        return jsonify({"message": "Format tanggal harus YYYY-MM-DD"}), 400
+
+    today = datetime.utcnow().date()
+    end_date = end_date or today
+    if start_date is None:
+        start_date = bucket_start(end_date, granularity)
+        for _ in range(config["TIMESERIES_DEFAULT_BUCKETS"][granularity] - 1):
+            start_date = bucket_start(start_date - timedelta(days=1), granularity)
+    if start_date > end_date:
+        return jsonify({"message": "start_date harus sebelum end_date"}), 400
+    buckets = buckets_between(start_date, end_date, granularity)
+    if len(buckets) > config["TIMESERIES_MAX_BUCKETS"]:
+        return jsonify({"message": f"Rentang terlalu panjang, maksimal {config['TIMESERIES_MAX_BUCKETS']} bucket"}), 400
+
+    try:
+        totals = timeseries_cache.series(granularity, buckets, today)
+        data = []
+        for bucket in buckets:
+            by_status = totals.get(bucket, {})
+            matching = [by_status.get(status_filter, (0, 0))] if status_filter else by_status.values()
+            data.append({
+                "bucket": bucket.isoformat(),
+                "total": str(Decimal(sum(total for total, _ in matching)).quantize(Decimal("0.01"))),
+                "count": sum(count for _, count in matching),
             })
-        return jsonify(result)
+        return jsonify({
+            "granularity": granularity,
+            "status": status_filter,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "data": data
+        })
+    except Exception as e:
+        return jsonify({"message": f"Error: {str(e)}"}), 500
+
+
+def money(value):
+    return str(Decimal(str(value or 0)).quantize(Decimal("0.01")))
+
+
+def rebuild_product_sales():
+    """Regenerate product_sales in one INSERT ... SELECT over completed transaction lines"""
+    ProductSales.query.delete()
+    db.session.execute(
+        insert(ProductSales).from_select(
+            ["vegetable_id", "units_sold", "revenue"],
+            live_product_sales()
+        )
+    )
+    db.session.commit()
+
+
+def live_product_sales():
+    """Units and revenue per vegetable: one join and aggregate of DetailTransactions and Transactions"""
+    return select(
+        DetailTransactions.vegetable_id,
+        func.sum(DetailTransactions.quantity),
+        func.sum(DetailTransactions.subtotal)
+    ).join(
+        Transactions, Transactions.id == DetailTransactions.transaction_id
+    ).where(
+        Transactions.transaction_status == 'completed'
+    ).group_by(DetailTransactions.vegetable_id)
+
+
+@finance_bp.cli.command("rebuild-product-sales")
+def rebuild_product_sales_command():
+    """Regenerate product_sales from DetailTransactions and verify it"""
+    rebuild_product_sales()
+
+    live = {vegetable_id: (units, money(revenue)) for vegetable_id, units, revenue in db.session.execute(live_product_sales())}
+    stored = {
+        row.vegetable_id: (row.units_sold, money(row.revenue))
+        for row in ProductSales.query.filter(ProductSales.units_sold != 0)
+    }
+    if live != stored:
+        for vegetable_id in sorted(live.keys() | stored.keys()):
+            if live.get(vegetable_id) != stored.get(vegetable_id):
+                click.echo(f"✗ sayuran {vegetable_id}: live={live.get(vegetable_id)} tersimpan={stored.get(vegetable_id)}")
+        raise SystemExit(1)
+
+    click.echo(f"✓ Penjualan produk dibangun ulang: {len(live)} sayuran")
+
+
+PRODUCT_SORTS = ('revenue', 'units', 'sell_through')
+
+
+def product_columns():
+    units_sold = func.coalesce(ProductSales.units_sold, 0)
+    revenue = func.coalesce(ProductSales.revenue, 0)
+    # Stock is what is left, so units sold plus stock is what was on offer
+    sell_through = cast(units_sold, Float) / func.nullif(units_sold + func.coalesce(Vegetables.stock, 0), 0)
+    return {
+        'units': units_sold.label('units_sold'),
+        'revenue': revenue.label('revenue'),
+        'sell_through': func.coalesce(sell_through, 0).label('sell_through'),
+    }
+
+
+def product_data(row):
+    return {
+        "vegetable_id": row.id,
+        "name": row.name,
+        "category": row.category,
+        "stock": row.stock,
+        "units_sold": row.units_sold,
+        "revenue": money(row.revenue),
+        "sell_through": round(row.sell_through, 4)
+    }
+
+
+@finance_bp.get("/products")
+@jwt_required()
+@reporting.read(Transactions, owner=Transactions.user_id)
+def products():
+    """Units sold, revenue and sell-through rate per vegetable"""
+    sort = request.args.get('sort', 'revenue')
+    if sort not in PRODUCT_SORTS:
+        return jsonify({"message": "Sort harus 'revenue', 'units' atau 'sell_through'"}), 400
+    category = request.args.get('category')
+    if category and category not in Vegetables.category.type.enums:
+        return jsonify({"message": "Kategori tidak valid"}), 400
+
+    try:
+        columns = product_columns()
+        query = select(
+            Vegetables.id, Vegetables.name, Vegetables.category, Vegetables.stock, *columns.values()
+        ).outerjoin(ProductSales, ProductSales.vegetable_id == Vegetables.id)
+        if category:
+            query = query.where(Vegetables.category == category)
+        rows = db.session.execute(query.order_by(columns[sort].desc(), Vegetables.id)).all()
+        return jsonify({"sort": sort, "category": category, "data": [product_data(row) for row in rows]})
+    except Exception as e:
+        return jsonify({"message": f"Error: {str(e)}"}), 500
+
+
+@finance_bp.get("/products/top")
+@jwt_required()
+@reporting.read(Transactions, owner=Transactions.user_id)
+def top_products():
+    """Top-N sellers per category, ranked in SQL with ROW_NUMBER()"""
+    sort = request.args.get('sort', 'units')
+    if sort not in ('revenue', 'units'):
+        return jsonify({"message": "Sort harus 'revenue' atau 'units'"}), 400
+    category = request.args.get('category')
+    if category and category not in Vegetables.category.type.enums:
+        return jsonify({"message": "Kategori tidak valid"}), 400
+    try:
+        limit = int(request.args.get('limit', current_app.config["TOP_PRODUCTS_DEFAULT"]))
+    except ValueError:
+        return jsonify({"message": "Limit harus berupa angka"}), 400
+    limit = max(1, min(limit, current_app.config["TOP_PRODUCTS_MAX"]))
+
+    try:
+        columns = product_columns()
+        rank = func.row_number().over(
+            partition_by=Vegetables.category, order_by=(columns[sort].desc(), Vegetables.id)
+        ).label('rank')
+        ranked = select(
+            Vegetables.id, Vegetables.name, Vegetables.category, Vegetables.stock, *columns.values(), rank
+        ).join(
+            ProductSales, ProductSales.vegetable_id == Vegetables.id
+        ).where(
+            ProductSales.units_sold > 0, Vegetables.category.isnot(None)
+        )
+        if category:
+            ranked = ranked.where(Vegetables.category == category)
+        ranked = ranked.subquery()
+        rows = db.session.execute(
+            select(ranked).where(ranked.c.rank <= limit).order_by(ranked.c.category, ranked.c.rank)
+        ).all()
+
+        data = {}
+        for row in rows:
+            data.setdefault(row.category, []).append(product_data(row))
+        return jsonify({"sort": sort, "limit": limit, "data": data})
     except Exception as e:
         return jsonify({"message": f"Error: {str(e)}"}), 500
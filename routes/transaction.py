@@ -1,47 +1,137 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, request, jsonify
 from extensions import db
 from models.transactions import Transactions
 from models.detail_transaction import DetailTransactions
+from models.finance_rollups import FinanceRollups
+from models.product_sales import ProductSales
+from models.stock_movements import StockMovements
+from models.vegetables import Vegetables
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from pagination import paginate
+from serializers import TRANSACTION_COLUMNS, transactions_with_items
+from catalog_cache import catalog_cache
+from timeseries import timeseries_cache
+from conditional import last_modified
+from reporting import reporting
+from transaction_code import generate_code
 from datetime import datetime
+from decimal import Decimal
 
 transaction_bp = Blueprint("transaction", __name__)
 
 
-def detail_item_data(detail):
-    """Serialize detail transaction item"""
-    return {
-        "vegetable_id": detail.vegetable_id,
-        "quantity": detail.quantity,
-        "unit_price": str(detail.unit_price),
-        "subtotal": str(detail.subtotal)
-    }
-
-
-def transaction_data(txn, include_user=False, include_timestamps=False):
-    """Serialize transaction data"""
-    data = {
-        "transaction_id": txn.id,
-        "code": txn.code,
-        "total_price": str(txn.total_price),
-        "payment_method": txn.payment_method,
-        "transaction_status": txn.transaction_status,
-        "notes": txn.notes,
-        "created_at": txn.created_at.isoformat() if txn.created_at else None,
-    }
-    if include_user:
-        data["user_id"] = txn.user_id
-    if include_timestamps:
-        data["updated_at"] = txn.updated_at.isoformat() if txn.updated_at else None
-    return data
-
-
-def transaction_with_items(txn, include_user=False, include_timestamps=False):
-    """Serialize transaction with its detail items"""
-    details = DetailTransactions.query.filter_by(transaction_id=txn.id).all()
-    data = transaction_data(txn, include_user, include_timestamps)
-    data["items"] = [detail_item_data(d) for d in details]
-    return data
+def record_rollup(txn, status, sign=1):
+    """Apply ``txn`` to the finance rollup bucket of its day and ``status``"""
+    if status is None:
+        return
+    day = (txn.created_at or datetime.utcnow()).date()
+    amount = Decimal(str(txn.total_price))
+    FinanceRollups.apply(day, status, sign * amount, sign)
+
+
+def record_product_sales(transaction_id, old_status, new_status):
+    """Apply a status change to product_sales when it enters or leaves ``completed``"""
+    if (old_status == "completed") != (new_status == "completed"):
+        ProductSales.apply(transaction_id, 1 if new_status == "completed" else -1)
+
+
+class CheckoutError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def record_stock(transaction, old_status, new_status, user_id, note=None):
+    """Return the items to stock when a transaction is cancelled, take them again when it is revived"""
+    if (old_status == "cancelled") == (new_status == "cancelled"):
+        return
+    kind, sign = ("cancellation", 1) if new_status == "cancelled" else ("sale", -1)
+    for item in transaction.items:
+        if not StockMovements.record(item.vegetable_id, kind, sign * item.quantity,
+                                     transaction_id=transaction.id, created_by=user_id, note=note):
+            raise CheckoutError(f"Stok sayuran {item.vegetable_id} tidak mencukupi", 409)
+
+
+def checkout_quantities(items):
+    """Validate request items and merge them into ``{vegetable_id: quantity}``"""
+    if not isinstance(items, list) or not items:
+        raise CheckoutError("Item transaksi harus diisi")
+
+    quantities = {}
+    for item in items:
+        try:
+            vegetable_id = int(item["vegetable_id"])
+            quantity = int(item["quantity"])
+        except (KeyError, TypeError, ValueError):
+            raise CheckoutError("Item transaksi tidak valid")
+        if quantity <= 0:
+            raise CheckoutError("Jumlah item harus lebih dari 0")
+        quantities[vegetable_id] = quantities.get(vegetable_id, 0) + quantity
+    return quantities
+
+
+def checkout(data, user_id, code):
+    """Reserve stock and insert the transaction with ``code``, then commit"""
+    quantities = checkout_quantities(data.get("items"))
+
+    # One batched lookup; prices always come from the catalog, never the client
+    prices = dict(db.session.execute(
+        select(Vegetables.id, Vegetables.price).where(
+            Vegetables.id.in_(quantities.keys()),
+            Vegetables.status == "available"
+        )
+    ).all())
+    missing = [vegetable_id for vegetable_id in quantities if vegetable_id not in prices]
+    if missing:
+        raise CheckoutError(f"Sayuran tidak tersedia: {missing}", 404)
+
+    # Conditional decrement: a concurrent checkout can never push stock below zero
+    for vegetable_id, quantity in quantities.items():
+        if not StockMovements.move(vegetable_id, -quantity):
+            raise CheckoutError(f"Stok sayuran {vegetable_id} tidak mencukupi", 409)
+
+    details = [
+        {
+            "vegetable_id": vegetable_id,
+            "quantity": quantity,
+            "unit_price": prices[vegetable_id],
+            "subtotal": prices[vegetable_id] * quantity
+        }
+        for vegetable_id, quantity in quantities.items()
+    ]
+    total_price = sum(detail["subtotal"] for detail in details)
+
+    transaction = Transactions(
+        code=code,
+        user_id=user_id,
+        total_price=total_price,
+        payment_method=data.get("payment_method", "transfer"),
+        transaction_status="pending",
+        notes=data.get("notes")
+    )
+    db.session.add(transaction)
+    db.session.flush()
+    record_rollup(transaction, transaction.transaction_status)
+
+    for detail in details:
+        detail["transaction_id"] = transaction.id
+    db.session.execute(insert(DetailTransactions), details)
+    db.session.execute(insert(StockMovements), [
+        {
+            "vegetable_id": vegetable_id,
+            "kind": "sale",
+            "quantity": -quantity,
+            "transaction_id": transaction.id,
+            "created_by": user_id
+        }
+        for vegetable_id, quantity in quantities.items()
+    ])
+
+    db.session.commit()
+    return transaction, total_price
 
 
 @transaction_bp.post("/create")
@@ -50,34 +140,27 @@ def create():
     try:
         data = request.get_json()
         user_id = get_jwt_identity()
-        
-        code = f"TRX{datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-        transaction = Transactions(
-            code=code,
-            user_id=user_id,
-            total_price=data["total_price"],
-            payment_method=data.get("payment_method", "transfer"),
-            transaction_status="pending",
-            notes=data.get("notes")
-        )
-        db.session.add(transaction)
-        db.session.commit()
+        code = generate_code()
+        try:
+            transaction, total_price = checkout(data, user_id, code)
+        except IntegrityError:
+            db.session.rollback()
+            if db.session.query(Transactions.id).filter_by(code=code).first() is None:
+                raise
+            # Backstop for a duplicate code: rerun the checkout once with a fresh one
+            transaction, total_price = checkout(data, user_id, generate_code())
+        catalog_cache.invalidate()
 
-        for item in data["items"]:
-            detail = DetailTransactions(
-                transaction_id=transaction.id,
-                vegetable_id=item["vegetable_id"],
-                quantity=item["quantity"],
-                unit_price=item["unit_price"],
-                subtotal=item["quantity"] * item["unit_price"]
-            )
-            db.session.add(detail)
-
-        db.session.commit()
-
-        return jsonify({"message": "Transaksi berhasil dibuat", "transaction_id": transaction.id}), 201
+        return jsonify({
+            "message": "Transaksi berhasil dibuat",
+            "transaction_id": transaction.id,
+            "code": transaction.code,
+            "total_price": str(total_price)
+        }), 201
 
+    except CheckoutError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"Error: {str(e)}"}), 500
@@ -88,13 +171,27 @@ def update(id):
     try:
         data = request.get_json()
         transaction = Transactions.query.get_or_404(id)
+        old_status = transaction.transaction_status
         transaction.transaction_status = data.get("transaction_status", transaction.transaction_status)
+        status_changed = transaction.transaction_status != old_status
+        if status_changed:
+            record_rollup(transaction, old_status, -1)
+            record_rollup(transaction, transaction.transaction_status)
+            record_product_sales(transaction.id, old_status, transaction.transaction_status)
+            record_stock(transaction, old_status, transaction.transaction_status, get_jwt_identity())
         if "payment_method" in data:
             transaction.payment_method = data["payment_method"]
         if "notes" in data:
             transaction.notes = data["notes"]
+        day = transaction.created_at.date()
         db.session.commit()
+        if status_changed:
+            timeseries_cache.invalidate(day)
+            catalog_cache.invalidate()
         return jsonify({"message": "Transaksi berhasil diperbarui"})
+    except CheckoutError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"Error: {str(e)}"}), 500
@@ -104,22 +201,34 @@ def update(id):
 @jwt_required()
 def history():
     user_id = get_jwt_identity()
-    transactions = Transactions.query.filter_by(user_id=user_id).all()
-    return jsonify([transaction_with_items(txn) for txn in transactions])
+    query = Transactions.query.with_entities(*TRANSACTION_COLUMNS).filter_by(user_id=user_id)
+    transactions, next_cursor = paginate(query, Transactions, descending=True)
+    return jsonify({
+        "data": transactions_with_items(transactions),
+        "next_cursor": next_cursor
+    })
 
 
 @transaction_bp.get("/detail/<int:id>")
 @jwt_required()
 def detail(id):
-    transaction = Transactions.query.get_or_404(id)
-    return jsonify(transaction_with_items(transaction, include_user=True, include_timestamps=True))
+    transaction = Transactions.query.with_entities(*TRANSACTION_COLUMNS).filter_by(id=id).first()
+    if transaction is None:
+        abort(404)
+    return jsonify(transactions_with_items([transaction], include_user=True, include_timestamps=True)[0])
 
 
 @transaction_bp.get("/all")
 @jwt_required()
+@reporting.read(Transactions, owner=Transactions.user_id)
+@last_modified(Transactions)
 def get_all():
-    transactions = Transactions.query.all()
-    return jsonify([transaction_with_items(txn, include_user=True, include_timestamps=True) for txn in transactions])
+    query = Transactions.query.with_entities(*TRANSACTION_COLUMNS)
+    transactions, next_cursor = paginate(query, Transactions, descending=True)
+    return jsonify({
+        "data": transactions_with_items(transactions, include_user=True, include_timestamps=True),
+        "next_cursor": next_cursor
+    })
 
 
 @transaction_bp.delete("/delete/<int:id>")
@@ -127,8 +236,20 @@ def get_all():
 def delete(id):
     try:
         transaction = Transactions.query.get_or_404(id)
+        record_rollup(transaction, transaction.transaction_status, -1)
+        record_product_sales(transaction.id, transaction.transaction_status, None)
+        # Items of a deleted sale go back on the shelf like a cancellation
+        record_stock(transaction, transaction.transaction_status, "cancelled", get_jwt_identity(),
+                     note=f"Transaksi {transaction.code} dihapus")
+        # SQLite does not enforce the ON DELETE SET NULL, so unlink the movements here
+        StockMovements.query.filter_by(transaction_id=transaction.id).update(
+            {"transaction_id": None}, synchronize_session=False
+        )
+        day = transaction.created_at.date()
         db.session.delete(transaction)
         db.session.commit()
+        timeseries_cache.invalidate(day)
+        catalog_cache.invalidate()
         return jsonify({"message": "Transaksi berhasil dihapus"})
     except Exception as e:
         db.session.rollback()
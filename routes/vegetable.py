@@ -1,29 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, current_app, request, jsonify
 from extensions import db
 from models.vegetables import Vegetables
-from models.users import Users
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.stock_movements import StockMovements
 from datetime import datetime
-from functools import wraps
-import requests
+from pagination import paginate
+from permissions import requires_permission
+from sqlalchemy import func, select, update as sql_update
+from category_predictor import predictor, classifier
+from catalog_cache import catalog_cache
+from conditional import last_modified
+from reporting import reporting
+from serializers import VEGETABLE_COLUMNS, VEGETABLE_DETAIL_COLUMNS, stock_movement_data, vegetable_data
+import search_index
+import click
 
 vegetable_bp = Blueprint("vegetable", __name__)
 
-def get_current_user():
-    return Users.query.get_or_404(int(get_jwt_identity()))
-
-def requires_permission(permission_check, error_msg="Anda tidak memiliki izin"):
-    def decorator(f):
-        @wraps(f)
-        @jwt_required()
-        def decorated_function(*args, **kwargs):
-            current_user = get_current_user()
-            if not permission_check(current_user):
-                return jsonify({"message": error_msg}), 403
-            return f(current_user, *args, **kwargs)
-        return decorated_function
-    return decorator
-
 def can_manage_vegetables(user):
     return user.sub_role in ['admin', 'rw', 'rt']
 
@@ -33,60 +25,47 @@ def can_update_stock(user):
 def can_view_admin(user):
     return user.role == 'admin' or user.sub_role in ['rw', 'rt', 'sekretaris', 'bendahara']
 
-def predict_category_from_image(image_url):
+def set_stock(veg, stock, user):
+    """Record the change to an absolute ``stock`` as an adjustment against the stock just read.
+
+    Returns an error response when it is invalid or another write changed the
+    stock in between (so it is never silently overwritten), else None.
+    """
     try:
-        response = requests.post(
-            "https://sukinnamz-klasifikasi-kategori-sayur.hf.space/predict",
-            json={"image_url": image_url},
-            timeout=10
-        )
-        if response.status_code == 200:
-            result = response.json()
-            predicted_category = result.get("category") or result.get("prediction")
-            if predicted_category in ['daun', 'akar', 'bunga', 'buah']:
-                return predicted_category
-        return None
-    except Exception as e:
-        print(f"Error predicting category: {str(e)}")
-        return None
-
-def vegetable_data(vegetable, detailed=False):
-    data = {
-        "id": vegetable.id,
-        "name": vegetable.name,
-        "description": vegetable.description or "",
-        "price": str(vegetable.price),
-        "stock": vegetable.stock,
-        "image": vegetable.image or "",
-        "category": vegetable.category,
-        "status": vegetable.status,
-        "created_by": vegetable.created_by,
-    }
-    
-    if detailed:
-        data.update({
-            "created_at": vegetable.created_at.isoformat() if vegetable.created_at else None,
-            "updated_at": vegetable.updated_at.isoformat() if vegetable.updated_at else None,
-        })
-    
-    return data
+        stock = int(stock)
+    except (TypeError, ValueError):
+        return jsonify({"message": "Stock harus berupa angka"}), 400
+    if stock < 0:
+        return jsonify({"message": "Stock tidak boleh negatif"}), 400
+    current = veg.stock or 0
+    if stock != current and not StockMovements.record(
+        veg.id, "adjustment", stock - current, expected=veg.stock, created_by=user.id
+    ):
+        db.session.rollback()
+        return jsonify({"message": "Stok telah berubah, muat ulang lalu coba lagi"}), 409
+    return None
 
 @vegetable_bp.get("/list")
+@catalog_cache.cached
 def list_vegetables():
-    vegetables = Vegetables.query.filter_by(status="available").all()
-    
-    vegetables.sort(key=lambda x: (0 if x.status == "available" else 1, x.name))
+    vegetables = Vegetables.query.with_entities(*VEGETABLE_COLUMNS).filter_by(
+        status="available"
+    ).order_by(Vegetables.name).all()
     
     return jsonify([vegetable_data(veg) for veg in vegetables]), 200
 
 @vegetable_bp.get("/get/<int:id>")
+@catalog_cache.cached
 def detail(id):
-    veg = Vegetables.query.get_or_404(id)
+    veg = Vegetables.query.with_entities(*VEGETABLE_DETAIL_COLUMNS).filter_by(id=id).first()
+    if veg is None:
+        abort(404)
     return jsonify(vegetable_data(veg, detailed=True)), 200
 
 @vegetable_bp.get("/by-category/<string:category>")
+@catalog_cache.cached
 def by_category(category):
-    vegetables = Vegetables.query.filter_by(
+    vegetables = Vegetables.query.with_entities(*VEGETABLE_COLUMNS).filter_by(
         category=category, 
         status="available"
     ).all()
@@ -104,14 +83,8 @@ def add(current_user):
         return jsonify({"message": "Sayuran dengan nama tersebut sudah ada"}), 409
     
     category = data.get("category")
-    predicted_category = None
-    
-    if data.get("image"):
-        predicted_category = predict_category_from_image(data["image"])
-        if predicted_category:
-            category = predicted_category
     
-    if not category:
+    if not category and not data.get("image"):
         return jsonify({"message": "Kategori sayuran harus diisi atau image harus valid untuk prediksi"}), 400
     
     vegetable = Vegetables(
@@ -121,22 +94,27 @@ def add(current_user):
         stock=int(data.get("stock", 0)),
         image=data.get("image", ""),
         category=category,
+        category_status="pending" if data.get("image") else "manual",
         status=data.get("status", "available"),
         created_by=current_user.id
     )
 
     db.session.add(vegetable)
+    db.session.flush()
+    if vegetable.stock:
+        db.session.add(StockMovements(
+            vegetable_id=vegetable.id, kind="restock", quantity=vegetable.stock, created_by=current_user.id
+        ))
     db.session.commit()
+    catalog_cache.invalidate()
 
-    response_data = {
+    if vegetable.category_status == "pending":
+        predictor.submit(vegetable.id, vegetable.image)
+
+    return jsonify({
         "message": "Sayuran berhasil ditambahkan",
         "vegetable": vegetable_data(vegetable)
-    }
-    
-    if predicted_category:
-        response_data["predicted_category"] = predicted_category
-    
-    return jsonify(response_data), 201
+    }), 201
 
 @vegetable_bp.put("/update/<int:id>")
 @requires_permission(can_manage_vegetables, "Anda tidak memiliki izin untuk mengupdate sayuran")
@@ -154,51 +132,93 @@ def update(current_user, id):
         if field in data:
             setattr(veg, field, data[field])
     
+    if 'category' in data:
+        veg.category_status = 'manual'
+    
     if 'price' in data:
         veg.price = float(data['price'])
     
     if 'stock' in data:
         if not can_update_stock(current_user):
             return jsonify({"message": "Anda tidak memiliki izin untuk mengupdate stok"}), 403
-        veg.stock = int(data['stock'])
+        error = set_stock(veg, data['stock'], current_user)
+        if error:
+            return error
     
     veg.updated_at = datetime.utcnow()
     db.session.commit()
+    catalog_cache.invalidate()
 
     return jsonify({
         "message": "Sayuran berhasil diperbarui",
         "vegetable": vegetable_data(veg)
     }), 200
 
+@vegetable_bp.get("/category-status/<int:id>")
+@requires_permission(can_manage_vegetables, "Unauthorized")
+def category_status(current_user, id):
+    veg = Vegetables.query.get_or_404(id)
+    return jsonify({
+        "id": veg.id,
+        "category": veg.category,
+        "category_status": veg.category_status,
+        "pipeline": predictor.snapshot()
+    }), 200
+
 @vegetable_bp.delete("/delete/<int:id>")
 @requires_permission(can_manage_vegetables, "Anda tidak memiliki izin untuk menghapus sayuran")
 def delete(current_user, id):
     veg = Vegetables.query.get_or_404(id)
     db.session.delete(veg)
     db.session.commit()
+    catalog_cache.invalidate()
     return jsonify({"message": "Sayuran berhasil dihapus"}), 200
 
 @vegetable_bp.get("/admin/list")
 @requires_permission(can_view_admin, "Unauthorized")
+@reporting.read(Vegetables)
+@last_modified(Vegetables)
 def admin_list(current_user):
-    vegetables = sorted(
-        Vegetables.query.all(),
-        key=lambda x: (x.status != "available", x.name)
-    )
-    return jsonify([vegetable_data(veg, detailed=True) for veg in vegetables]), 200
+    vegetables, next_cursor = paginate(Vegetables.query.with_entities(*VEGETABLE_DETAIL_COLUMNS), Vegetables)
+    return jsonify({
+        "data": [vegetable_data(veg, detailed=True) for veg in vegetables],
+        "next_cursor": next_cursor
+    }), 200
+
+@vegetable_bp.get("/admin/cache-stats")
+@requires_permission(can_view_admin, "Unauthorized")
+def cache_stats(current_user):
+    return jsonify(catalog_cache.snapshot()), 200
 
 @vegetable_bp.put("/update-stock/<int:id>")
 @requires_permission(can_update_stock, "Hanya admin dan sekretaris yang dapat mengupdate stok")
 def update_stock(current_user, id):
     veg = Vegetables.query.get_or_404(id)
     data = request.get_json()
-    
-    if "stock" not in data:
-        return jsonify({"message": "Stock harus diisi"}), 400
-    
-    veg.stock = int(data["stock"])
-    veg.updated_at = datetime.utcnow()
+
+    if "delta" in data:
+        # Relative movements commute, so concurrent restocks and sales never clobber each other
+        kind = data.get("kind", "restock")
+        if kind not in ("restock", "adjustment"):
+            return jsonify({"message": "Kind harus 'restock' atau 'adjustment'"}), 400
+        try:
+            delta = int(data["delta"])
+        except (TypeError, ValueError):
+            return jsonify({"message": "Delta harus berupa angka"}), 400
+        if delta == 0 or (kind == "restock" and delta < 0):
+            return jsonify({"message": "Delta restock harus lebih dari 0"}), 400
+        if not StockMovements.record(veg.id, kind, delta, created_by=current_user.id, note=data.get("note")):
+            db.session.rollback()
+            return jsonify({"message": "Stok tidak mencukupi"}), 409
+    elif "stock" in data:
+        error = set_stock(veg, data["stock"], current_user)
+        if error:
+            return error
+    else:
+        return jsonify({"message": "Delta atau stock harus diisi"}), 400
+
     db.session.commit()
+    catalog_cache.invalidate()
 
     return jsonify({
         "message": "Stok berhasil diperbarui",
@@ -217,29 +237,99 @@ def update_status(current_user, id):
     veg.status = data["status"]
     veg.updated_at = datetime.utcnow()
     db.session.commit()
+    catalog_cache.invalidate()
 
     return jsonify({
         "message": "Status berhasil diperbarui",
         "vegetable": vegetable_data(veg)
     }), 200
 
+@vegetable_bp.get("/stock-history/<int:id>")
+@requires_permission(can_view_admin, "Unauthorized")
+def stock_history(current_user, id):
+    Vegetables.query.get_or_404(id)
+    movements, next_cursor = paginate(StockMovements.query.filter_by(vegetable_id=id), StockMovements, descending=True)
+    return jsonify({
+        "data": [stock_movement_data(movement) for movement in movements],
+        "next_cursor": next_cursor
+    }), 200
+
 @vegetable_bp.get("/search")
 def search():
     query = request.args.get('q', '')
     category = request.args.get('category', '')
+    try:
+        limit = int(request.args.get('limit', current_app.config["SEARCH_LIMIT_DEFAULT"]))
+    except ValueError:
+        limit = current_app.config["SEARCH_LIMIT_DEFAULT"]
+    limit = max(1, min(limit, current_app.config["SEARCH_LIMIT_MAX"]))
     
-    vegetables = Vegetables.query.filter_by(status="available")
-    
-    if query:
-        vegetables = vegetables.filter(
-            (Vegetables.name.ilike(f"%{query}%")) |
-            (Vegetables.description.ilike(f"%{query}%"))
-        )
+    vegetables = Vegetables.query.with_entities(*VEGETABLE_COLUMNS).filter_by(status="available")
     
     if category:
         vegetables = vegetables.filter_by(category=category)
     
-    vegetables = vegetables.all()
-    vegetables.sort(key=lambda x: x.name)
+    if query:
+        vegetables = search_index.search(vegetables, query, limit)
+    else:
+        vegetables = vegetables.order_by(Vegetables.name).limit(limit)
     
-    return jsonify([vegetable_data(veg) for veg in vegetables]), 200
\ No newline at end of file
+    return jsonify([vegetable_data(veg) for veg in vegetables.all()]), 200
+
+@vegetable_bp.cli.command("purge-prediction-cache")
+def purge_prediction_cache():
+    """Delete cached category predictions older than CATEGORY_CACHE_TTL"""
+    deleted = classifier.purge_expired(current_app.config)
+    click.echo(f"✓ {deleted} prediksi kadaluarsa dihapus")
+
+@vegetable_bp.cli.command("rebuild-search-index")
+def rebuild_search_index():
+    """Create the full-text search index if missing and reindex all vegetables"""
+    with db.engine.begin() as conn:
+        if not search_index.rebuild(conn):
+            click.echo("✗ Full-text index hanya tersedia untuk SQLite (FTS5)")
+            return
+    click.echo("✓ Index pencarian dibangun ulang")
+
+
+def stock_drift():
+    """``[(id, name, cached stock, ledger stock)]`` where Vegetables.stock differs from its movements"""
+    ledger = select(
+        StockMovements.vegetable_id, func.sum(StockMovements.quantity).label("on_hand")
+    ).group_by(StockMovements.vegetable_id).subquery()
+    cached = func.coalesce(Vegetables.stock, 0)
+    on_hand = func.coalesce(ledger.c.on_hand, 0)
+    return db.session.execute(
+        select(Vegetables.id, Vegetables.name, cached, on_hand)
+        .outerjoin(ledger, ledger.c.vegetable_id == Vegetables.id)
+        .where(cached != on_hand)
+        .order_by(Vegetables.id)
+    ).all()
+
+
+@vegetable_bp.cli.command("reconcile-stock")
+@click.option("--fix", is_flag=True, help="Reset drifted stock to the ledger total")
+def reconcile_stock(fix):
+    """Compare Vegetables.stock with the stock movement ledger (run periodically, e.g. from cron)"""
+    drift = stock_drift()
+    for vegetable_id, name, cached, on_hand in drift:
+        current_app.logger.warning("Stock drift for vegetable %s: cached=%s ledger=%s", vegetable_id, cached, on_hand)
+        click.echo(f"✗ {name} (id {vegetable_id}): stok={cached} ledger={on_hand}")
+    if not drift:
+        click.echo("✓ Stok sesuai dengan ledger")
+        return
+    if not fix:
+        raise SystemExit(1)
+
+    fixed = 0
+    for vegetable_id, name, cached, on_hand in drift:
+        # Only if untouched since the check; a concurrent movement keeps both sides in step
+        fixed += db.session.execute(
+            sql_update(Vegetables)
+            .where(Vegetables.id == vegetable_id, func.coalesce(Vegetables.stock, 0) == cached)
+            .values(stock=on_hand, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.session.commit()
+    catalog_cache.invalidate()
+    click.echo(f"✓ {fixed} stok disesuaikan dengan ledger")
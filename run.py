@@ -1,6 +1,10 @@
 from app import create_app
+from extensions import db
 
 app = create_app()
 
 if __name__ == "__main__":
+    # Dev server only; production runs wsgi:app under gunicorn
+    with app.app_context():
+        db.create_all()
     app.run(debug=True)
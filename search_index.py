@@ -0,0 +1,108 @@
+import re
+from sqlalchemy import case, column, event, func, literal_column, table, text
+from extensions import db
+from models.vegetables import Vegetables
+
+FTS_TABLE = "vegetables_fts"
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='vegetables', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON vegetables BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON vegetables BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON vegetables BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+fts = table(FTS_TABLE, column("rowid"))
+
+# Engines already checked for the FTS table, keyed by URL
+_available = {}
+
+
+def install(connection):
+    """Create the FTS5 index and the triggers that keep it in sync (SQLite only)"""
+    if connection.dialect.name != "sqlite":
+        return False
+    for ddl in FTS_DDL:
+        connection.exec_driver_sql(ddl)
+    _available.pop(str(connection.engine.url), None)
+    return True
+
+
+def rebuild(connection):
+    """Install the index if needed and reindex every vegetable"""
+    if not install(connection):
+        return False
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+@event.listens_for(Vegetables.__table__, "after_create")
+def _install_on_create(target, connection, **kw):
+    install(connection)
+
+
+@event.listens_for(Vegetables.__table__, "after_drop")
+def _drop_on_drop(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        _available.pop(str(connection.engine.url), None)
+
+
+def fts_available():
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _available:
+        available = False
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                available = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": FTS_TABLE}
+                ).first() is not None
+        _available[key] = available
+    return _available[key]
+
+
+def match_expression(q):
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    words = re.findall(r"\w+", q, re.UNICODE)
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def search(query, q, limit):
+    """Filter ``query`` (over Vegetables) by ``q``, ranked by relevance and limited in SQL"""
+    if fts_available():
+        expression = match_expression(q)
+        if not expression:
+            return query.order_by(Vegetables.name).limit(limit)
+        return query.join(fts, fts.c.rowid == Vegetables.id).filter(
+            text(f"{FTS_TABLE} MATCH :match").bindparams(match=expression)
+        ).order_by(
+            func.bm25(literal_column(FTS_TABLE)), Vegetables.name
+        ).limit(limit)
+
+    # Fallback for engines without FTS5: name prefix, then name, then description
+    pattern = f"%{q}%"
+    rank = case(
+        (Vegetables.name.ilike(f"{q}%"), 0),
+        (Vegetables.name.ilike(pattern), 1),
+        else_=2
+    )
+    return query.filter(
+        Vegetables.name.ilike(pattern) | Vegetables.description.ilike(pattern)
+    ).order_by(rank, Vegetables.name).limit(limit)
@@ -1,18 +1,253 @@
-from flask import Flask
-from config import Config
+from flask import Flask, current_app
+from config import get_config
 from extensions import db
-from models import Users, Vegetables, Transactions, DetailTransactions
+from models import Users, Vegetables, Transactions, DetailTransactions, FinanceRollups, ProductSales, StockMovements
 from werkzeug.security import generate_password_hash
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
+from itertools import accumulate
+import argparse
+import random
+import time
 
-def seed():
+# Bulk mode: every synthetic user logs in with this password
+BULK_PASSWORD = "rahasia"
+BULK_CHUNK = 20_000
+BULK_PRAGMAS = {"synchronous": "OFF", "cache_size": -256000, "temp_store": "MEMORY"}
+YEAR = 365 * 86400
+
+VEGETABLE_NAMES = {
+    "akar": ["Bawang Bombay", "Wortel", "Kentang", "Lobak", "Bit", "Jahe", "Kunyit", "Singkong", "Ubi", "Bawang Merah"],
+    "daun": ["Kangkung", "Kubis", "Sawi Putih", "Bayam", "Selada", "Daun Singkong", "Pakcoy", "Katuk", "Kemangi", "Seledri"],
+    "buah": ["Tomat", "Timun", "Cabai", "Terong", "Labu Siam", "Paprika", "Pare", "Oyong", "Buncis", "Kacang Panjang"],
+    "bunga": ["Bunga Kol", "Brokoli", "Bunga Pepaya", "Jantung Pisang", "Kecombrang"],
+}
+VEGETABLE_VARIANTS = ["", "Organik", "Lokal", "Premium", "Segar", "Hidroponik", "Super", "Kecil", "Besar", "Merah", "Hijau", "Import", "Petani"]
+STAFF = [("admin", "admin"), ("admin", "sekretaris"), ("admin", "bendahara"), ("user", "rw")]
+LINES_PER_TRANSACTION = ([1, 2, 3, 4, 5, 6, 7, 8], [35, 28, 18, 9, 5, 3, 1, 1])
+QUANTITIES = ([1, 2, 3, 4, 5, 10], [50, 25, 12, 6, 4, 3])
+STATUSES = (["completed", "pending", "cancelled"], [75, 15, 10])
+
+
+def zipf_weights(n, s):
+    """Cumulative weights where rank r is picked proportionally to 1 / r**s"""
+    return list(accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def weighted_draws(rng, population, cum_weights, k):
+    """Endless weighted draws from ``population``, generated ``k`` at a time"""
+    while True:
+        yield from rng.choices(population, cum_weights=cum_weights, k=k)
+
+
+def insert_rows(conn, table, columns, rows):
+    """executemany tuples straight through the driver, skipping per-row ORM/type processing"""
+    conn.exec_driver_sql(
+        f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        rows
+    )
+
+
+def relax_pragmas(conn, pragmas):
+    """Apply ``pragmas`` and return the previous values so they can be restored"""
+    previous = {}
+    for name, value in pragmas.items():
+        previous[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+        conn.exec_driver_sql(f"PRAGMA {name}={value}")
+    return previous
+
+
+def timestamps(start):
+    """``stamp(seconds)``: the SQLite DATETIME string ``seconds`` after ``start``.
+
+    Formats from a per-day prefix instead of datetime arithmetic per row.
+    """
+    days = {}
+
+    def stamp(seconds):
+        day, second = divmod(int(seconds), 86400)
+        prefix = days.get(day)
+        if prefix is None:
+            prefix = days[day] = (start + timedelta(days=day)).strftime("%Y-%m-%d")
+        hour, rest = divmod(second, 3600)
+        return f"{prefix} {hour:02d}:{rest // 60:02d}:{rest % 60:02d}.{int(seconds % 1 * 1e6):06d}"
+    return stamp
+
+
+def synthetic_users(count, rng, fake, hashed, stamp):
+    names = [fake.name() for _ in range(500)]
+    addresses = [fake.address().replace("\n", ", ") for _ in range(500)]
+    rt_count = max(1, count // 200)
+    rows = []
+    for i in range(count):
+        if i < len(STAFF):
+            role, sub_role = STAFF[i]
+        else:
+            role, sub_role = "user", "rt" if i < len(STAFF) + rt_count else "warga"
+        created_at = stamp(rng.random() * YEAR)
+        rows.append((
+            rng.choice(names), f"{sub_role}{i}@parisy.com", hashed, role, sub_role, 0,
+            rng.choice(addresses), f"08{int(rng.random() * 10 ** 10):010d}", created_at, created_at
+        ))
+    return rows
+
+
+def synthetic_vegetables(rng, stamp):
+    catalog = [
+        (category, f"{name} {variant}".strip())
+        for category, names in VEGETABLE_NAMES.items() for name in names for variant in VEGETABLE_VARIANTS
+    ]
+    rng.shuffle(catalog)
+    created_at = stamp(0)
+    return [
+        (name, f"{name} dari petani sekitar", rng.randrange(3000, 40000, 500), 10 ** 9, "", category,
+         "manual", "available" if rng.random() < 0.95 else "unavailable", 1, created_at, created_at)
+        for category, name in catalog[:200]
+    ]
+
+
+def synthetic_transactions(first_id, offsets, rng, stamp, prices, buyers, picks, quantities):
+    """Transaction and detail rows for one chunk of sorted offsets (seconds after the start)"""
+    count = len(offsets)
+    statuses = rng.choices(*STATUSES, k=count)
+    line_counts = rng.choices(*LINES_PER_TRANSACTION, k=count)
+    user_ids = rng.choices(buyers, cum_weights=zipf_weights(len(buyers), 0.8), k=count)
+
+    transactions, details = [], []
+    for n, offset in enumerate(offsets):
+        transaction_id = first_id + n
+        picked = set()
+        while len(picked) < line_counts[n]:
+            picked.add(next(picks))
+        total = 0
+        for index in sorted(picked):
+            quantity = next(quantities)
+            subtotal = prices[index] * quantity
+            total += subtotal
+            details.append((transaction_id, index + 1, quantity, prices[index], subtotal))
+
+        status = statuses[n]
+        created_at = stamp(offset)
+        updated_at = created_at if status == "pending" else stamp(offset + 300 + rng.random() * 36000)
+        transactions.append((
+            transaction_id, f"TRX{created_at[2:10].replace('-', '')}{transaction_id:010d}", user_ids[n], total,
+            "cash" if rng.random() < 0.4 else "transfer", status,
+            None if rng.random() < 0.8 else "Tolong antar sore", created_at, updated_at
+        ))
+    return transactions, details
+
+
+def bulk_seed(scale, seed=1):
+    """Replace all data with ``scale`` synthetic transactions (SQLite, inside an app context).
+
+    Rows are deterministic for a given ``seed``: buyers and vegetables
+    follow a Zipf-like popularity, 1-8 detail lines per transaction and
+    mostly completed statuses over the last year. Returns rows per table.
+    """
+    from faker import Faker
+    from routes.finance import rebuild_product_sales, rebuild_rollups
+
+    if db.engine.dialect.name != "sqlite":
+        raise RuntimeError("Mode bulk hanya mendukung SQLite")
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    fake = Faker("id_ID")
+    fake.seed_instance(seed)
+    stamp = timestamps(datetime.utcnow().replace(microsecond=0) - timedelta(days=365))
+    # One hash for every synthetic user instead of one per row
+    hashed = generate_password_hash(BULK_PASSWORD, current_app.config["PASSWORD_HASH_METHOD"])
+
+    tables = [DetailTransactions, Transactions, Vegetables, Users]
+    user_count = max(50, scale // 20)
+    counts = {}
+
+    with db.engine.connect() as conn:
+        previous = relax_pragmas(conn, BULK_PRAGMAS)
+        try:
+            for model in (FinanceRollups, ProductSales, StockMovements):
+                conn.exec_driver_sql(f"DELETE FROM {model.__table__.name}")
+            for model in tables:
+                conn.exec_driver_sql(f"DELETE FROM {model.__table__.name}")
+            # Secondary indexes are rebuilt once at the end instead of per row
+            indexes = [index for model in tables for index in model.__table__.indexes]
+            for index in indexes:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+
+            users = synthetic_users(user_count, rng, fake, hashed, stamp)
+            insert_rows(conn, Users.__table__, [
+                "name", "email", "password", "role", "sub_role", "role_version",
+                "address", "phone", "created_at", "updated_at"
+            ], users)
+            vegetables = synthetic_vegetables(rng, stamp)
+            insert_rows(conn, Vegetables.__table__, [
+                "name", "description", "price", "stock", "image", "category",
+                "category_status", "status", "created_by", "created_at", "updated_at"
+            ], vegetables)
+            # Synthetic sales leave the stock alone, so the opening balance is the whole ledger
+            conn.exec_driver_sql(
+                f"INSERT INTO {StockMovements.__table__.name} (vegetable_id, kind, quantity, note, created_at) "
+                f"SELECT id, 'restock', stock, 'Saldo awal', created_at FROM {Vegetables.__table__.name}"
+            )
+            counts.update(users=len(users), vegetables=len(vegetables), transactions=0, detail_transactions=0)
+
+            prices = [row[2] for row in vegetables]
+            buyers = list(range(len(STAFF) + 1, user_count + 1))
+            # Catalog order doubles as popularity rank
+            picks = weighted_draws(rng, range(len(prices)), zipf_weights(len(prices), 1.1), BULK_CHUNK)
+            quantities = weighted_draws(rng, QUANTITIES[0], list(accumulate(QUANTITIES[1])), BULK_CHUNK)
+            # Sorted so ids grow with created_at like real traffic
+            offsets = sorted(rng.random() * YEAR for _ in range(scale))
+            for chunk in range(0, scale, BULK_CHUNK):
+                transactions, details = synthetic_transactions(
+                    chunk + 1, offsets[chunk:chunk + BULK_CHUNK], rng, stamp, prices, buyers, picks, quantities
+                )
+                insert_rows(conn, Transactions.__table__, [
+                    "id", "code", "user_id", "total_price", "payment_method",
+                    "transaction_status", "notes", "created_at", "updated_at"
+                ], transactions)
+                insert_rows(conn, DetailTransactions.__table__, [
+                    "transaction_id", "vegetable_id", "quantity", "unit_price", "subtotal"
+                ], details)
+                counts["transactions"] += len(transactions)
+                counts["detail_transactions"] += len(details)
+
+            for index in indexes:
+                index.create(conn, checkfirst=True)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            relax_pragmas(conn, previous)
+
+    rebuild_rollups()
+    rebuild_product_sales()
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"✓ {total} baris dalam {elapsed:.1f} s ({total / elapsed:,.0f} baris/s): {counts}")
+    return counts
+
+
+def seed(scale=None, seed=1):
+    """Seed the demo data, or ``scale`` synthetic transactions with bulk inserts"""
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(get_config())
     db.init_app(app)
     
     with app.app_context():
+        if scale:
+            bulk_seed(scale, seed)
+            return
+
         # Drop
+        FinanceRollups.query.delete()
+        ProductSales.query.delete()
+        StockMovements.query.delete()
         DetailTransactions.query.delete()
         Transactions.query.delete()
         Vegetables.query.delete()
@@ -196,8 +431,17 @@ def seed():
         ]
         
         db.session.add_all(vegetables)
+        db.session.flush()
+        db.session.add_all([
+            StockMovements(vegetable_id=veg.id, kind="restock", quantity=veg.stock, created_by=veg.created_by)
+            for veg in vegetables if veg.stock
+        ])
         db.session.commit()
         print(f"✓ {len(vegetables)} sayuran berhasil ditambahkan")
         
 if __name__ == "__main__":
-    seed()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=None, help="bulk mode: number of synthetic transactions")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    seed(scale=args.scale, seed=args.seed)
@@ -0,0 +1,152 @@
+from extensions import db
+from models.detail_transaction import DetailTransactions
+from models.transactions import Transactions
+from models.users import Users
+from models.vegetables import Vegetables
+from sqlalchemy import select
+
+# Read endpoints select just these columns and serialize the plain rows;
+# the *_data functions also accept ORM objects after writes.
+VEGETABLE_COLUMNS = (
+    Vegetables.id, Vegetables.name, Vegetables.description, Vegetables.price,
+    Vegetables.stock, Vegetables.image, Vegetables.category,
+    Vegetables.category_status, Vegetables.status, Vegetables.created_by,
+)
+VEGETABLE_DETAIL_COLUMNS = VEGETABLE_COLUMNS + (Vegetables.created_at, Vegetables.updated_at)
+
+TRANSACTION_COLUMNS = (
+    Transactions.id, Transactions.code, Transactions.user_id, Transactions.total_price,
+    Transactions.payment_method, Transactions.transaction_status, Transactions.notes,
+    Transactions.created_at, Transactions.updated_at,
+)
+
+DETAIL_ITEM_COLUMNS = (
+    DetailTransactions.transaction_id, DetailTransactions.vegetable_id,
+    DetailTransactions.quantity, DetailTransactions.unit_price, DetailTransactions.subtotal,
+)
+
+USER_COLUMNS = (
+    Users.id, Users.name, Users.email, Users.password, Users.role, Users.sub_role,
+    Users.address, Users.phone, Users.created_at, Users.updated_at,
+)
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+def vegetable_data(vegetable, detailed=False):
+    data = {
+        "id": vegetable.id,
+        "name": vegetable.name,
+        "description": vegetable.description or "",
+        "price": str(vegetable.price),
+        "stock": vegetable.stock,
+        "image": vegetable.image or "",
+        "category": vegetable.category,
+        "category_status": vegetable.category_status,
+        "status": vegetable.status,
+        "created_by": vegetable.created_by,
+    }
+
+    if detailed:
+        data.update({
+            "created_at": isoformat(vegetable.created_at),
+            "updated_at": isoformat(vegetable.updated_at),
+        })
+
+    return data
+
+
+def stock_movement_data(movement):
+    return {
+        "id": movement.id,
+        "vegetable_id": movement.vegetable_id,
+        "kind": movement.kind,
+        "quantity": movement.quantity,
+        "transaction_id": movement.transaction_id,
+        "created_by": movement.created_by,
+        "note": movement.note,
+        "created_at": isoformat(movement.created_at),
+    }
+
+
+def detail_item_data(detail):
+    """Serialize detail transaction item"""
+    return {
+        "vegetable_id": detail.vegetable_id,
+        "quantity": detail.quantity,
+        "unit_price": str(detail.unit_price),
+        "subtotal": str(detail.subtotal)
+    }
+
+
+def transaction_data(txn, include_user=False, include_timestamps=False):
+    """Serialize transaction data"""
+    data = {
+        "transaction_id": txn.id,
+        "code": txn.code,
+        "total_price": str(txn.total_price),
+        "payment_method": txn.payment_method,
+        "transaction_status": txn.transaction_status,
+        "notes": txn.notes,
+        "created_at": isoformat(txn.created_at),
+    }
+    if include_user:
+        data["user_id"] = txn.user_id
+    if include_timestamps:
+        data["updated_at"] = isoformat(txn.updated_at)
+    return data
+
+
+def transactions_with_items(rows, include_user=False, include_timestamps=False):
+    """Serialize transaction rows with their items, fetched in one extra query"""
+    items = {row.id: [] for row in rows}
+    if items:
+        details = db.session.execute(
+            select(*DETAIL_ITEM_COLUMNS).where(
+                DetailTransactions.transaction_id.in_(items.keys())
+            ).order_by(DetailTransactions.id)
+        )
+        for detail in details:
+            items[detail.transaction_id].append(detail_item_data(detail))
+
+    result = []
+    for row in rows:
+        data = transaction_data(row, include_user, include_timestamps)
+        data["items"] = items[row.id]
+        result.append(data)
+    return result
+
+
+def history_data(txn):
+    return {
+        "id": txn.id,
+        "code": txn.code,
+        "user_id": txn.user_id,
+        "total_price": str(txn.total_price),
+        "payment_method": txn.payment_method,
+        "transaction_status": txn.transaction_status,
+        "notes": txn.notes,
+        "created_at": isoformat(txn.created_at),
+        "updated_at": isoformat(txn.updated_at)
+    }
+
+
+def user_data(user, data_full=False):
+    data = {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "password": user.password,
+        "role": user.role,
+        "sub_role": user.sub_role
+    }
+    if data_full:
+        data.update({
+            "address": user.address,
+            "phone": user.phone,
+            "created_at": user.created_at,
+            "updated_at": user.updated_at
+        })
+    return data
@@ -1,11 +1,11 @@
 from flask import Flask
-from config import Config
+from config import get_config
 from extensions import db
 import models
 
 def tables():
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(get_config())
     db.init_app(app)
     
     with app.app_context():
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from app import create_app
+from extensions import db
+from models import StockMovements, Users, Vegetables
+from user_cache import role_claims, user_cache
+
+pytest_plugins = ["query_budget"]
+
+
+@pytest.fixture
+def app():
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    # Process-wide singleton: don't carry one test's users into the next
+    user_cache.entries.clear()
+    user_cache.versions.clear()
+    user_cache.versions_loaded_at = None
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return ``(id, auth headers)``"""
+    def make(email, role="user", sub_role="warga"):
+        with app.app_context():
+            user = Users(
+                name=email.split("@")[0],
+                email=email,
+                password=generate_password_hash("rahasia", app.config["PASSWORD_HASH_METHOD"]),
+                role=role,
+                sub_role=sub_role
+            )
+            db.session.add(user)
+            db.session.commit()
+            token = create_access_token(str(user.id), additional_claims=role_claims(user))
+            return user.id, {"Authorization": "Bearer " + token}
+    return make
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin@parisy.com", role="admin", sub_role="admin")
+
+
+@pytest.fixture
+def warga(make_user):
+    return make_user("budi@parisy.com")
+
+
+@pytest.fixture
+def vegetables(app):
+    """Ids of two available vegetables with plenty of stock, opened in the stock ledger"""
+    with app.app_context():
+        rows = [
+            Vegetables(name="Wortel", price=1000, stock=1000, category="akar"),
+            Vegetables(name="Bayam", price=2500, stock=1000, category="daun"),
+        ]
+        db.session.add_all(rows)
+        db.session.flush()
+        db.session.add_all([StockMovements(vegetable_id=row.id, kind="restock", quantity=row.stock) for row in rows])
+        db.session.commit()
+        return [row.id for row in rows]
@@ -0,0 +1,29 @@
+from extensions import db
+from models import Users
+
+NEW_VEGETABLE = {"name": "Kangkung", "price": 3000, "stock": 5, "category": "daun"}
+
+
+def test_deleted_user_token_is_revoked(client, admin, make_user):
+    admin_id, admin_headers = admin
+    other_id, other_headers = make_user("admin2@parisy.com", role="admin", sub_role="admin")
+    assert client.get(f"/auth/profile/{other_id}", headers=other_headers).status_code == 200
+
+    assert client.delete(f"/auth/delete/{other_id}", headers=admin_headers).status_code == 200
+
+    assert client.post("/vegetable/add", headers=other_headers, json=NEW_VEGETABLE).status_code == 404
+    assert client.delete(f"/auth/delete/{admin_id}", headers=other_headers).status_code == 404
+    assert client.get(f"/auth/profile/{admin_id}", headers=admin_headers).status_code == 200
+
+
+def test_deletion_by_another_worker_is_picked_up_on_refresh(app, client, make_user):
+    app.config["USER_ROLE_VERSION_REFRESH"] = 0
+    user_id, headers = make_user("admin2@parisy.com", role="admin", sub_role="admin")
+    assert client.post("/vegetable/add", headers=headers, json=NEW_VEGETABLE).status_code == 201
+
+    # Deleted through another process: this one's cache never heard of it
+    with app.app_context():
+        db.session.delete(db.session.get(Users, user_id))
+        db.session.commit()
+
+    assert client.post("/vegetable/add", headers=headers, json=dict(NEW_VEGETABLE, name="Sawi")).status_code == 404
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+from app import create_app
+from config import TestingConfig
+from extensions import db
+from models import StockMovements, Vegetables
+
+STOCK = 20
+THREADS = 4
+ATTEMPTS = 10
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """The test app on a SQLite file, so checkouts really run in parallel"""
+    monkeypatch.setattr(TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'checkout.db'}")
+    monkeypatch.setattr(TestingConfig, "SQLALCHEMY_ENGINE_OPTIONS", {"connect_args": {"timeout": 15}}, raising=False)
+    monkeypatch.setattr(TestingConfig, "SQLITE_PRAGMAS", {"journal_mode": "WAL", "busy_timeout": 15000})
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def test_conditional_decrement_never_oversells(app):
+    with app.app_context():
+        veg = Vegetables(name="Wortel", price=1000, stock=3, category="akar")
+        db.session.add(veg)
+        db.session.commit()
+        assert not StockMovements.move(veg.id, -4)
+        assert not StockMovements.move(veg.id, -1, expected=2)
+        assert StockMovements.move(veg.id, -3, expected=3)
+        db.session.commit()
+        assert db.session.get(Vegetables, veg.id).stock == 0
+
+
+def test_concurrent_checkouts_sell_out_exactly(app, warga, vegetables):
+    _, headers = warga
+    vegetable_id = vegetables[0]
+    with app.app_context():
+        db.session.get(Vegetables, vegetable_id).stock = STOCK
+        db.session.commit()
+
+    statuses = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(THREADS)
+
+    def buyer():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(ATTEMPTS):
+            response = client.post("/transaction/create", headers=headers, json={
+                "items": [{"vegetable_id": vegetable_id, "quantity": 1}], "payment_method": "cash"
+            })
+            with lock:
+                statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=buyer) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] * STOCK + [409] * (THREADS * ATTEMPTS - STOCK)
+    with app.app_context():
+        assert db.session.get(Vegetables, vegetable_id).stock == 0
+        sold = db.session.scalar(
+            db.select(db.func.sum(StockMovements.quantity)).where(
+                StockMovements.vegetable_id == vegetable_id, StockMovements.kind == "sale"
+            )
+        )
+        assert sold == -STOCK
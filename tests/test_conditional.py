@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import conditional
+from extensions import db
+from models import Vegetables
+
+
+def age_vegetables(app):
+    """Move every updated_at out of the current second"""
+    with app.app_context():
+        Vegetables.query.update({"updated_at": datetime.utcnow() - timedelta(minutes=5)})
+        db.session.commit()
+
+
+def test_matching_etag_gets_304(app, client, admin, vegetables):
+    _, headers = admin
+    age_vegetables(app)
+    first = client.get("/vegetable/admin/list", headers=headers)
+    assert first.status_code == 200 and first.headers["ETag"]
+
+    response = client.get("/vegetable/admin/list", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_if_modified_since_alone_never_hides_a_delete(app, client, admin, vegetables):
+    _, headers = admin
+    age_vegetables(app)
+    first = client.get("/vegetable/admin/list", headers=headers)
+    assert len(first.get_json()["data"]) == 2
+
+    # Deleting the older row leaves max(updated_at) where it was
+    with app.app_context():
+        db.session.delete(db.session.get(Vegetables, vegetables[1]))
+        db.session.commit()
+    response = client.get("/vegetable/admin/list", headers={
+        **headers, "If-Modified-Since": first.headers["Last-Modified"]
+    })
+    assert response.status_code == 200
+    assert len(response.get_json()["data"]) == 1
+
+
+def test_no_304_while_updated_at_is_in_the_current_second(app, client, admin, vegetables, monkeypatch):
+    _, headers = admin
+    written = datetime(2026, 10, 18, 12, 0, 0)
+    with app.app_context():
+        Vegetables.query.update({"updated_at": written})
+        db.session.commit()
+
+    class Clock(datetime):
+        now = written + timedelta(milliseconds=500)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now
+
+    monkeypatch.setattr(conditional, "datetime", Clock)
+    first = client.get("/vegetable/admin/list", headers=headers)
+    response = client.get("/vegetable/admin/list", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 200
+
+    Clock.now = written + timedelta(seconds=1)
+    response = client.get("/vegetable/admin/list", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_unauthorized_caller_gets_403_not_304(client, warga):
+    _, headers = warga
+    future = (datetime.utcnow() + timedelta(days=1)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    response = client.get("/auth/all", headers={**headers, "If-Modified-Since": future, "If-None-Match": "*"})
+    assert response.status_code == 403
+    assert "ETag" not in response.headers
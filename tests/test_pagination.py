@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+from extensions import db
+from models import Transactions, Vegetables
+from pagination import encode_cursor
+from test_transaction_queries import checkout
+
+TIE = datetime(2026, 10, 1, 8, 0, 0)
+
+
+def pages(client, path, headers, limit, key="id"):
+    """Ids of every page of ``path`` and the number of pages"""
+    ids, cursor, count = [], None, 0
+    while True:
+        query = {"limit": limit} if cursor is None else {"limit": limit, "cursor": cursor}
+        response = client.get(path, headers=headers, query_string=query)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        ids += [row[key] for row in body["data"]]
+        count += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, count
+
+
+def test_ascending_pages_cover_ties_exactly_once(app, client, admin):
+    _, headers = admin
+    with app.app_context():
+        # Ties on created_at, with and without microseconds, around a server-default row
+        rows = [Vegetables(name=f"Sayur {i}", price=1000, stock=1, category="daun", created_at=TIE) for i in range(5)]
+        rows += [Vegetables(name=f"Sayur {i}", price=1000, stock=1, category="daun",
+                            created_at=TIE.replace(microsecond=500)) for i in range(5, 8)]
+        rows.append(Vegetables(name="Sayur baru", price=1000, stock=1, category="daun"))
+        db.session.add_all(rows)
+        db.session.commit()
+        expected = [row.id for row in rows]
+
+    ids, count = pages(client, "/vegetable/admin/list", headers, limit=3)
+    assert ids == expected
+    assert count == 3
+
+
+def test_descending_pages_cover_ties_exactly_once(app, client, admin, warga, vegetables):
+    _, admin_headers = admin
+    _, warga_headers = warga
+    for _ in range(7):
+        checkout(client, warga_headers, vegetables[:1])
+    with app.app_context():
+        db.session.execute(db.update(Transactions).values(created_at=TIE))
+        db.session.commit()
+        expected = sorted(db.session.scalars(db.select(Transactions.id)), reverse=True)
+
+    ids, count = pages(client, "/transaction/all", admin_headers, limit=2, key="transaction_id")
+    assert ids == expected
+    assert count == 4
+
+
+def test_last_page_has_no_cursor(client, admin, vegetables):
+    _, headers = admin
+    body = client.get("/vegetable/admin/list", headers=headers, query_string={"limit": 2}).get_json()
+    assert len(body["data"]) == 2
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", ["bukan-cursor", encode_cursor(123, 1), "WzFd", encode_cursor("2026", "x")])
+def test_invalid_cursor_is_rejected(client, admin, cursor):
+    _, headers = admin
+    response = client.get("/vegetable/admin/list", headers=headers, query_string={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "Cursor tidak valid"}
@@ -0,0 +1,48 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from extensions import db
+from models import Users
+from password_hasher import password_hasher
+
+TARGET = "scrypt:1024:8:1"
+
+
+@pytest.mark.parametrize("method, rehash", [
+    ("scrypt:1024:8:1", False),
+    ("scrypt:2048:8:1", False),
+    ("scrypt:512:8:1", True),
+    ("scrypt:1024:4:1", True),
+    ("pbkdf2:sha256:600000", False),
+    ("pbkdf2:sha512:600000", False),
+    ("pbkdf2:sha1:600000", True),
+])
+def test_needs_rehash(app, method, rehash):
+    app.config["PASSWORD_HASH_METHOD"] = TARGET
+    with app.app_context():
+        assert password_hasher.needs_rehash(method + "$salt$hash") is rehash
+
+
+def test_needs_rehash_pbkdf2_target(app):
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:600000"
+    with app.app_context():
+        assert password_hasher.needs_rehash("pbkdf2:sha256:260000$salt$hash")
+        assert not password_hasher.needs_rehash("pbkdf2:sha256:1000000$salt$hash")
+        assert not password_hasher.needs_rehash("scrypt:32768:8:1$salt$hash")
+
+
+@pytest.mark.parametrize("method, upgraded", [(TARGET, False), ("pbkdf2:sha256:1000", False), ("pbkdf2:sha1:1000", True)])
+def test_login_keeps_sound_hashes(app, client, method, upgraded):
+    app.config["PASSWORD_HASH_METHOD"] = TARGET
+    stored = generate_password_hash("rahasia", method)
+    with app.app_context():
+        user = Users(name="budi", email="budi@parisy.com", password=stored, role="user", sub_role="warga")
+        db.session.add(user)
+        db.session.commit()
+
+    response = client.post("/auth/login", json={"email": "budi@parisy.com", "password": "rahasia"})
+    assert response.status_code == 200
+
+    with app.app_context():
+        password = db.session.scalar(db.select(Users.password))
+    assert (password != stored) is upgraded
+    assert password.startswith(TARGET if upgraded else method)
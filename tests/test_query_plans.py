@@ -0,0 +1,65 @@
+import re
+
+import pytest
+from sqlalchemy import event
+from extensions import db
+
+# A bare "SCAN <table>" is a full table scan; index scans read "SCAN t USING [COVERING] INDEX"
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+ROUTES = [
+    ("/transaction/all", "admin"),
+    ("/transaction/history", "warga"),
+    ("/transaction/detail/1", "admin"),
+    ("/finance/history", "admin"),
+    ("/finance/history?status=completed", "admin"),
+    ("/finance/history?start_date=2026-01-01&end_date=2026-12-31", "admin"),
+    ("/finance/timeseries?granularity=week", "admin"),
+    ("/vegetable/list", None),
+    ("/vegetable/get/1", None),
+    ("/vegetable/by-category/daun", None),
+    ("/vegetable/search?q=wortel", None),
+    ("/vegetable/admin/list", "admin"),
+    ("/auth/all", "admin"),
+]
+
+
+# The FTS availability probe reads the schema catalog, not application data
+CATALOG_TABLES = {"sqlite_master", "sqlite_schema"}
+
+
+def full_scans(statement, parameters):
+    plan = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    return [
+        match.group(1) for *_, detail in plan
+        if (match := FULL_SCAN.match(detail)) and match.group(1) not in CATALOG_TABLES
+    ]
+
+
+@pytest.mark.parametrize("path, user", ROUTES)
+def test_route_queries_use_indexes(app, client, admin, warga, vegetables, path, user):
+    headers = {"admin": admin[1], "warga": warga[1]}.get(user, {})
+    response = client.post("/transaction/create", headers=warga[1], json={
+        "items": [{"vegetable_id": vegetables[0], "quantity": 1}], "payment_method": "cash"
+    })
+    assert response.status_code == 201
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.get_json()
+    assert statements
+
+    with app.app_context():
+        scans = {statement: tables for statement, parameters in statements if (tables := full_scans(statement, parameters))}
+    assert not scans, "\n\n".join(f"full scan of {tables}:\n{statement}" for statement, tables in scans.items())
@@ -0,0 +1,38 @@
+from models import StockMovements
+from routes.vegetable import stock_drift
+
+
+def stock(client, vegetable_id):
+    return client.get(f"/vegetable/get/{vegetable_id}").get_json()["stock"]
+
+
+def test_deleting_a_transaction_returns_its_stock(app, client, admin, warga, vegetables):
+    _, admin_headers = admin
+    response = client.post("/transaction/create", headers=warga[1], json={
+        "items": [{"vegetable_id": vegetables[0], "quantity": 3}], "payment_method": "cash"
+    })
+    transaction_id = response.get_json()["transaction_id"]
+    client.post(f"/transaction/update/{transaction_id}", headers=admin_headers, json={"transaction_status": "completed"})
+    assert stock(client, vegetables[0]) == 997
+
+    assert client.delete(f"/transaction/delete/{transaction_id}", headers=admin_headers).status_code == 200
+
+    assert stock(client, vegetables[0]) == 1000
+    products = client.get("/finance/products", headers=admin_headers).get_json()["data"]
+    assert all(product["units_sold"] == 0 for product in products)
+    with app.app_context():
+        assert stock_drift() == []
+        movements = StockMovements.query.filter_by(vegetable_id=vegetables[0]).order_by(StockMovements.id).all()
+        assert [movement.kind for movement in movements] == ["restock", "sale", "cancellation"]
+        assert all(movement.transaction_id is None for movement in movements)
+
+
+def test_deleting_a_cancelled_transaction_leaves_stock_alone(client, admin, warga, vegetables):
+    _, admin_headers = admin
+    response = client.post("/transaction/create", headers=warga[1], json={
+        "items": [{"vegetable_id": vegetables[0], "quantity": 3}], "payment_method": "cash"
+    })
+    transaction_id = response.get_json()["transaction_id"]
+    client.post(f"/transaction/update/{transaction_id}", headers=admin_headers, json={"transaction_status": "cancelled"})
+    assert client.delete(f"/transaction/delete/{transaction_id}", headers=admin_headers).status_code == 200
+    assert stock(client, vegetables[0]) == 1000
@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import runpy
+import threading
+from types import SimpleNamespace
+
+import pytest
+import routes.transaction
+from transaction_code import MAX_WORKER, generate_code, generator, slot_worker_id
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+PROCESSES = 4
+THREADS = 2
+CODES = 20000
+
+
+def produce(slot):
+    """Codes per thread of one forked worker, which gets its id from its slot as under gunicorn"""
+    generator.assign(slot_worker_id(slot))
+    results = [None] * THREADS
+
+    def run(index):
+        results[index] = [generate_code() for _ in range(CODES)]
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_duplicate_code_is_retried_once(client, warga, vegetables, monkeypatch):
+    _, headers = warga
+    order = {"items": [{"vegetable_id": vegetables[0], "quantity": 1}], "payment_method": "cash"}
+    first = client.post("/transaction/create", headers=headers, json=order).get_json()
+
+    codes = iter([first["code"], generate_code()])
+    monkeypatch.setattr(routes.transaction, "generate_code", lambda: next(codes))
+    response = client.post("/transaction/create", headers=headers, json=order)
+
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()["code"] != first["code"]
+    stock = client.get(f"/vegetable/get/{vegetables[0]}").get_json()["stock"]
+    assert stock == 998
+
+
+def test_worker_slots_are_unique_and_reused():
+    pre_fork = runpy.run_path(GUNICORN_CONF)["pre_fork"]
+    server = SimpleNamespace(WORKERS={})
+    for pid in range(100, 104):
+        worker = SimpleNamespace()
+        pre_fork(server, worker)
+        server.WORKERS[pid] = worker
+    assert sorted(worker.slot for worker in server.WORKERS.values()) == [0, 1, 2, 3]
+
+    # A recycled worker takes over the freed slot
+    del server.WORKERS[101]
+    worker = SimpleNamespace()
+    pre_fork(server, worker)
+    assert worker.slot == 1
+
+
+def test_slot_worker_id_offsets_and_bounds(monkeypatch):
+    monkeypatch.setenv("TRANSACTION_WORKER_ID", "8")
+    assert slot_worker_id(3) == 11
+    with pytest.raises(ValueError):
+        slot_worker_id(MAX_WORKER)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_codes_are_unique_across_processes_and_threads(monkeypatch):
+    monkeypatch.delenv("TRANSACTION_WORKER_ID", raising=False)
+    # Generate in the parent first, so the at-fork reset is exercised
+    generate_code()
+    with multiprocessing.get_context("fork").Pool(PROCESSES) as pool:
+        batches = pool.map(produce, range(PROCESSES))
+
+    codes = [thread_codes for process in batches for thread_codes in process]
+    for thread_codes in codes:
+        assert all(a < b for a, b in zip(thread_codes, thread_codes[1:]))
+        assert all(len(code) <= 20 for code in thread_codes)
+    total = sum(len(thread_codes) for thread_codes in codes)
+    assert len({code for thread_codes in codes for code in thread_codes}) == total
@@ -0,0 +1,35 @@
+def checkout(client, headers, vegetable_ids):
+    response = client.post("/transaction/create", headers=headers, json={
+        "items": [{"vegetable_id": vegetable_id, "quantity": 1} for vegetable_id in vegetable_ids],
+        "payment_method": "cash"
+    })
+    assert response.status_code == 201, response.get_json()
+
+
+def query_counts(client, query_budget, endpoint, path, headers):
+    # The first request warms the user cache; count the second
+    for _ in range(2):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200
+    return query_budget.queries(endpoint)[-1]
+
+
+def test_transaction_lists_use_constant_queries(client, query_budget, admin, warga, vegetables):
+    _, admin_headers = admin
+    _, warga_headers = warga
+    endpoints = [
+        ("GET /transaction/all", "/transaction/all", admin_headers),
+        ("GET /transaction/history", "/transaction/history", warga_headers),
+    ]
+
+    checkout(client, warga_headers, vegetables)
+    single = [query_counts(client, query_budget, *endpoint) for endpoint in endpoints]
+
+    for _ in range(9):
+        checkout(client, warga_headers, vegetables)
+    many = [query_counts(client, query_budget, *endpoint) for endpoint in endpoints]
+
+    assert many == single
+    data = client.get("/transaction/all", headers=admin_headers).get_json()["data"]
+    assert len(data) == 10
+    assert all(len(transaction["items"]) == 2 for transaction in data)
@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func
+from flask import current_app
+from extensions import db
+from models.transactions import Transactions
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def bucket_start(day, granularity):
+    """First day of the bucket containing ``day`` (weeks start on Monday)"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def buckets_between(start, end, granularity):
+    """Bucket starts from the bucket of ``start`` through the bucket of ``end``"""
+    bucket, buckets = bucket_start(start, granularity), []
+    while bucket <= end:
+        buckets.append(bucket)
+        bucket = next_bucket(bucket, granularity)
+    return buckets
+
+
+def bucket_expression(granularity):
+    """SQL for the bucket start of Transactions.created_at, as 'YYYY-MM-DD'"""
+    if granularity == "week":
+        return func.date(Transactions.created_at, "-6 days", "weekday 1")
+    if granularity == "month":
+        return func.strftime("%Y-%m-01", Transactions.created_at)
+    return func.date(Transactions.created_at)
+
+
+def bucket_totals(granularity, start, end):
+    """``{bucket start: {status: (total, count)}}`` for buckets in [start, end), one GROUP BY"""
+    bucket = bucket_expression(granularity)
+    rows = db.session.query(
+        bucket,
+        Transactions.transaction_status,
+        func.sum(Transactions.total_price),
+        func.count(Transactions.id)
+    ).filter(
+        Transactions.created_at >= datetime.combine(start, datetime.min.time()),
+        Transactions.created_at < datetime.combine(end, datetime.min.time())
+    ).group_by(bucket, Transactions.transaction_status).all()
+
+    totals = {}
+    for key, status, total, count in rows:
+        totals.setdefault(date.fromisoformat(key), {})[status] = (Decimal(str(total or 0)), count)
+    return totals
+
+
+class TimeseriesCache:
+    """Per-process cache of closed revenue time-series buckets.
+
+    Buckets before the current one are computed once with a GROUP BY and
+    kept, so a request only recomputes the open bucket, whose rows the
+    created_at index narrows to the current period. A status change or
+    delete of an older transaction drops the buckets of its day through
+    ``invalidate()``; ``TIMESERIES_CACHE_TTL`` bounds how stale another
+    worker process can be.
+    """
+
+    def __init__(self, app=None):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.generation = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("TIMESERIES_CACHE_TTL", 300)
+        app.config.setdefault("TIMESERIES_DEFAULT_BUCKETS", {"day": 30, "week": 12, "month": 12})
+        app.config.setdefault("TIMESERIES_MAX_BUCKETS", 366)
+        app.extensions["timeseries_cache"] = self
+
+    def _cached(self, granularity, buckets):
+        now = time.monotonic()
+        found = {}
+        with self.lock:
+            for bucket in buckets:
+                entry = self.entries.get((granularity, bucket))
+                if entry is None:
+                    continue
+                if now >= entry[1]:
+                    del self.entries[(granularity, bucket)]
+                    continue
+                found[bucket] = entry[0]
+        return found
+
+    def series(self, granularity, buckets, today):
+        """``{bucket start: {status: (total, count)}}`` for ``buckets`` (sorted bucket starts)"""
+        current = bucket_start(today, granularity)
+        closed = [bucket for bucket in buckets if bucket < current]
+        totals = self._cached(granularity, closed)
+
+        missing = [bucket for bucket in closed if bucket not in totals]
+        if missing:
+            with self.lock:
+                generation = self.generation
+            computed = bucket_totals(granularity, missing[0], next_bucket(missing[-1], granularity))
+            expires = time.monotonic() + current_app.config["TIMESERIES_CACHE_TTL"]
+            with self.lock:
+                # A past transaction changed while these were being computed
+                if generation == self.generation:
+                    for bucket in missing:
+                        self.entries[(granularity, bucket)] = (computed.get(bucket, {}), expires)
+            for bucket in missing:
+                totals[bucket] = computed.get(bucket, {})
+
+        if buckets and buckets[-1] >= current:
+            totals.update(bucket_totals(granularity, current, next_bucket(buckets[-1], granularity)))
+        return totals
+
+    def invalidate(self, day):
+        """Drop the cached buckets containing ``day``"""
+        with self.lock:
+            self.generation += 1
+            for granularity in GRANULARITIES:
+                self.entries.pop((granularity, bucket_start(day, granularity)), None)
+
+
+timeseries_cache = TimeseriesCache()
@@ -0,0 +1,108 @@
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+MS_PER_DAY = 24 * 3600 * 1000
+# ms-of-day (27 bits) + worker + sequence fits in 10 base36 digits
+BODY_WIDTH = 10
+
+
+def default_worker_id():
+    """TRANSACTION_WORKER_ID from the environment, else derived from host and pid.
+
+    Only for single-process runs: pids can collide modulo 1024, so gunicorn
+    workers get ``slot_worker_id()`` from their slot instead.
+    """
+    if os.environ.get("TRANSACTION_WORKER_ID"):
+        return int(os.environ["TRANSACTION_WORKER_ID"]) & MAX_WORKER
+    host = zlib.crc32(socket.gethostname().encode()) & MAX_WORKER
+    return (host ^ os.getpid()) & MAX_WORKER
+
+
+def slot_worker_id(slot):
+    """Worker id of server worker ``slot``, offset by TRANSACTION_WORKER_ID.
+
+    Workers on one host get consecutive ids; give each host a disjoint
+    range through TRANSACTION_WORKER_ID (e.g. host index * workers).
+    """
+    worker_id = int(os.environ.get("TRANSACTION_WORKER_ID", 0)) + slot
+    if worker_id > MAX_WORKER:
+        raise ValueError(f"Transaction worker id {worker_id} exceeds {MAX_WORKER}")
+    return worker_id
+
+
+def base36(number, width):
+    digits = []
+    while number:
+        number, remainder = divmod(number, 36)
+        digits.append(ALPHABET[remainder])
+    return "".join(reversed(digits)).rjust(width, "0")
+
+
+class TransactionCodeGenerator:
+    """Time-ordered, collision-free transaction codes without a DB round trip.
+
+    ``TRX`` + ``YYMMDD`` (UTC) + 10 base36 digits packing the millisecond of
+    the day, a 10-bit worker id and a 12-bit per-millisecond sequence, e.g.
+    ``TRX261018215GX5N1FK``. Codes from one worker are strictly increasing;
+    codes from different workers sort by millisecond.
+    """
+
+    def __init__(self, worker_id=None):
+        self.lock = threading.Lock()
+        self.worker_id = worker_id
+        self.last_ms = -1
+        self.sequence = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # A forked worker must not reuse the parent's worker id or sequence
+        self.lock = threading.Lock()
+        self.worker_id = None
+        self.last_ms = -1
+        self.sequence = 0
+
+    def _next_ms(self):
+        now = int(time.time() * 1000)
+        if now > self.last_ms:
+            self.last_ms = now
+            self.sequence = 0
+            return
+        # Same millisecond, or the clock stepped back: keep counting on
+        # last_ms and borrow the next millisecond once it is exhausted
+        self.sequence += 1
+        if self.sequence > MAX_SEQUENCE:
+            self.last_ms += 1
+            self.sequence = 0
+
+    def assign(self, worker_id):
+        with self.lock:
+            self.worker_id = worker_id
+
+    def generate(self):
+        with self.lock:
+            if self.worker_id is None:
+                self.worker_id = default_worker_id()
+            self._next_ms()
+            ms, worker_id, sequence = self.last_ms, self.worker_id, self.sequence
+
+        day, ms_of_day = divmod(ms, MS_PER_DAY)
+        date = datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime("%y%m%d")
+        body = (ms_of_day << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | sequence
+        return f"TRX{date}{base36(body, BODY_WIDTH)}"
+
+
+generator = TransactionCodeGenerator()
+
+
+def generate_code():
+    return generator.generate()
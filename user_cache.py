@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import abort, current_app
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from extensions import db
+from models.users import Users
+
+
+class CurrentUser:
+    """The fields authorization needs, detached from any session"""
+
+    __slots__ = ("id", "role", "sub_role", "role_version")
+
+    def __init__(self, id, role, sub_role, role_version=0):
+        self.id = id
+        self.role = role
+        self.sub_role = sub_role
+        self.role_version = role_version
+
+
+# Known version of a deleted user: no token's ``rv`` reaches it
+DELETED = float("inf")
+
+# Ids per existence check, well under SQLite's bound-parameter limit
+EXISTS_CHUNK = 500
+
+
+def role_claims(user):
+    """Additional JWT claims issued at login"""
+    return {"role": user.role, "sub_role": user.sub_role, "rv": user.role_version or 0}
+
+
+class UserCache:
+    """Per-process cache of users' roles, invalidated by ``role_version``.
+
+    Tokens carry ``role``/``sub_role``/``rv`` claims and are trusted without
+    a DB round trip unless ``rv`` is older than the user's known
+    ``role_version``. Known versions are refreshed with one query at most
+    every ``USER_ROLE_VERSION_REFRESH`` seconds, which bounds how long
+    another worker keeps honouring claims from before a role change. The
+    same refresh checks that the users seen since the last one still exist
+    and tombstones deleted ones, so their tokens stop working too.
+    """
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.versions_loaded_at = None
+        self.seen = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("USER_CACHE_SIZE", 1024)
+        app.config.setdefault("USER_CACHE_TTL", 60)
+        app.config.setdefault("USER_ROLE_VERSION_REFRESH", 30)
+        app.extensions["user_cache"] = self
+
+    def known_version(self, user_id):
+        refresh = current_app.config["USER_ROLE_VERSION_REFRESH"]
+        now = time.monotonic()
+        with self.lock:
+            self.seen.add(user_id)
+            stale = self.versions_loaded_at is None or now - self.versions_loaded_at >= refresh
+            if stale:
+                # Claim the refresh so concurrent requests keep using the old map
+                self.versions_loaded_at = now
+                checked, self.seen = self.seen | set(self.entries), set()
+        if stale:
+            rows = db.session.query(Users.id, Users.role_version).filter(Users.role_version > 0).all()
+            checked = sorted(checked)
+            existing = set()
+            for start in range(0, len(checked), EXISTS_CHUNK):
+                existing.update(id for id, in db.session.query(Users.id).filter(
+                    Users.id.in_(checked[start:start + EXISTS_CHUNK])
+                ))
+            with self.lock:
+                for id, version in rows:
+                    if version > self.versions.get(id, 0):
+                        self.versions[id] = version
+                        self.entries.pop(id, None)
+                for id in set(checked) - existing:
+                    self.versions[id] = DELETED
+                    self.entries.pop(id, None)
+        with self.lock:
+            return self.versions.get(user_id, 0)
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None:
+                user, expires = entry
+                if time.monotonic() < expires:
+                    self.entries.move_to_end(user_id)
+                    return user
+                del self.entries[user_id]
+
+        row = db.session.query(
+            Users.id, Users.role, Users.sub_role, Users.role_version
+        ).filter(Users.id == user_id).first()
+        if row is None:
+            return None
+        user = CurrentUser(row.id, row.role, row.sub_role, row.role_version or 0)
+
+        config = current_app.config
+        with self.lock:
+            self.entries[user_id] = (user, time.monotonic() + config["USER_CACHE_TTL"])
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > config["USER_CACHE_SIZE"]:
+                self.entries.popitem(last=False)
+            if user.role_version > self.versions.get(user_id, 0):
+                self.versions[user_id] = user.role_version
+        return user
+
+    def invalidate(self, user_id, role_version=None):
+        with self.lock:
+            self.entries.pop(user_id, None)
+            if role_version is not None:
+                self.versions[user_id] = role_version
+
+    def revoke(self, user_id):
+        """Stop honouring a deleted user's tokens in this process"""
+        with self.lock:
+            self.entries.pop(user_id, None)
+            self.versions[user_id] = DELETED
+
+
+user_cache = UserCache()
+
+
+def get_current_user():
+    """Current user from the JWT claims, falling back to the cache/DB for stale or old tokens"""
+    user_id = int(get_jwt_identity())
+    claims = get_jwt()
+    if "role" in claims and claims.get("rv", 0) >= user_cache.known_version(user_id):
+        return CurrentUser(user_id, claims["role"], claims.get("sub_role"), claims.get("rv", 0))
+
+    user = user_cache.get(user_id)
+    if user is None:
+        abort(404)
+    return user
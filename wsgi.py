@@ -0,0 +1,11 @@
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+APP_ENV picks the config (default: prod). The schema is not created here;
+run `flask --app wsgi db upgrade` (or `flask --app wsgi init-db`) on deploy.
+"""
+import os
+from app import create_app
+
+app = create_app(os.environ.get("APP_ENV", "prod"))